@@ -0,0 +1,205 @@
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process exclude each other
+    fcntl = None
+
+# Buckets are numbered from this (naive, local time) moment, like the log timestamps
+_EPOCH = datetime(1970, 1, 1)
+
+
+class ActivityCounters:
+    """Rolling activity counts in minute, hour and day buckets.
+
+    log_action adds one to the bucket of every unit for the entry's action,
+    for all entries and, for actions containing "error", for errors, so the
+    dashboards read a handful of counters instead of scanning the log.
+
+    The counts live in a small memory-mapped file shared by all worker
+    processes, like DataVersion's: a header, a table of action names
+    (the first ACTIONS actions seen get their own counts; later ones only
+    count towards all entries and errors), then per unit a ring of bucket
+    numbers and a row of 32-bit counts per ring slot. A slot is zeroed and
+    reused when a newer bucket maps to it, so each unit keeps its last
+    UNITS[unit][1] buckets: 25 hours of minutes, 8 days of hours and 400
+    days. Updates take an exclusive lockf on the file.
+    """
+
+    UNITS = {'minute': (60, 1500), 'hour': (3600, 200), 'day': (86400, 400)}
+    # The next smaller unit, for the partial bucket at the start of a count
+    _FINER = {'hour': 'minute', 'day': 'hour'}
+    ACTIONS = 64
+    _NAME = 64
+    _HEADER = struct.Struct('<4sII')
+    _MAGIC = b'ACT1'
+    # Count rows: all entries, errors, then one per action in the name table
+    _ALL = 0
+    _ERRORS = 1
+
+    def __init__(self, path):
+        self.path = path
+        self._series = 2 + self.ACTIONS
+        self._layout = {}
+        words = self._names_end = (self._HEADER.size + self.ACTIONS * self._NAME) // 4
+        for unit, (seconds, slots) in self.UNITS.items():
+            self._layout[unit] = (seconds, slots, words, words + slots)
+            words += slots * (1 + self._series)
+        self._size = words * 4
+        self._lock = threading.Lock()
+        self._fd = None
+        self._actions = {}
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            if os.fstat(fd).st_size < self._size:
+                os.ftruncate(fd, self._size)
+            self._buffer = mmap.mmap(fd, self._size)
+            self._fd = fd
+        except (OSError, ValueError) as e:
+            print(f"Shared activity counters unavailable, using per-process counters: {e}")
+            self._buffer = bytearray(self._size)
+        self._words = memoryview(self._buffer).cast('I')
+        with self._locked():
+            magic, version, seeded = self._HEADER.unpack_from(self._buffer, 0)
+            if magic != self._MAGIC:
+                self._buffer[:self._size] = bytes(self._size)
+                self._HEADER.pack_into(self._buffer, 0, self._MAGIC, 1, 0)
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if self._fd is None or fcntl is None:
+                yield
+                return
+            # lockf (not flock) so forked workers sharing the fd still exclude each other
+            fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    @property
+    def seeded(self):
+        """False until the counts have been built from the existing log (see rebuild)."""
+        return bool(self._HEADER.unpack_from(self._buffer, 0)[2])
+
+    def _action_row(self, action, create=False):
+        row = self._actions.get(action)
+        if row is not None:
+            return row
+        # Another worker may have added it: look through the shared table
+        name = str(action).encode('utf-8')[:self._NAME]
+        for i in range(self.ACTIONS):
+            offset = self._HEADER.size + i * self._NAME
+            stored = bytes(self._buffer[offset:offset + self._NAME]).rstrip(b'\0')
+            if stored == name:
+                self._actions[action] = 2 + i
+                return 2 + i
+            if not stored:
+                if not create:
+                    return None
+                self._buffer[offset:offset + len(name)] = name
+                self._actions[action] = 2 + i
+                return 2 + i
+        return None
+
+    def _add(self, moment, action):
+        rows = [self._ALL]
+        if 'error' in str(action).lower():
+            rows.append(self._ERRORS)
+        row = self._action_row(action, create=True)
+        if row is not None:
+            rows.append(row)
+        since = (moment - _EPOCH).total_seconds()
+        words = self._words
+        for seconds, slots, ids, counts in self._layout.values():
+            bucket = int(since // seconds)
+            slot = bucket % slots
+            current = words[ids + slot]
+            if current > bucket + 1:
+                # Older than anything the ring still holds
+                continue
+            base = counts + slot * self._series
+            if current < bucket + 1:
+                self._buffer[base * 4:(base + self._series) * 4] = bytes(self._series * 4)
+                words[ids + slot] = bucket + 1
+            for row in rows:
+                words[base + row] += 1
+
+    def add(self, action, moment=None):
+        """Count one log entry of action, logged at moment (default now)."""
+        with self._locked():
+            self._add(moment or datetime.now(), action)
+
+    def rebuild(self, entries):
+        """Replace all counts with those of entries (log entries, as LogStore returns them)."""
+        with self._locked():
+            # Action names keep their rows: other workers have them cached
+            self._buffer[self._names_end * 4:self._size] = bytes(self._size - self._names_end * 4)
+            self._HEADER.pack_into(self._buffer, 0, self._MAGIC, 1, 1)
+            for entry in entries:
+                try:
+                    moment = datetime.fromisoformat(entry['timestamp'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                self._add(moment, entry.get('action'))
+
+    def buckets(self, unit, start, end=None, action=None, errors=False):
+        """(bucket start, count) for the non-empty unit buckets from start, oldest first.
+
+        Buckets run from the one holding start, whole, up to the one holding
+        end (default now); those older than the ring keeps are left out.
+        action is one action or several; errors counts actions containing
+        "error" instead.
+        """
+        seconds, slots, ids, counts = self._layout[unit]
+        first = int((start - _EPOCH).total_seconds() // seconds)
+        last = int(((end or datetime.now()) - _EPOCH).total_seconds() // seconds)
+        first = max(first, last - slots + 1)
+        with self._locked():
+            if errors:
+                rows = [self._ERRORS]
+            elif action is None:
+                rows = [self._ALL]
+            else:
+                actions = (action,) if isinstance(action, str) else tuple(action)
+                rows = [row for row in (self._action_row(a) for a in actions) if row is not None]
+            words = self._words
+            found = []
+            for bucket in range(first, last + 1):
+                slot = bucket % slots
+                if words[ids + slot] != bucket + 1:
+                    continue
+                base = counts + slot * self._series
+                count = sum(words[base + row] for row in rows)
+                if count:
+                    found.append((bucket, count))
+        return [(_EPOCH + timedelta(seconds=bucket * seconds), count) for bucket, count in found]
+
+    def _holds(self, unit, moment):
+        seconds, slots, ids, counts = self._layout[unit]
+        since = (moment - _EPOCH).total_seconds() // seconds
+        return (datetime.now() - _EPOCH).total_seconds() // seconds - since < slots
+
+    def count(self, unit, start, end=None, action=None, errors=False):
+        """Entries from start up to the end of the unit bucket holding end.
+
+        The whole unit buckets after start are counted in unit; the part of
+        the bucket holding start comes from the next smaller unit, down to
+        the minute holding start, while that unit's ring still holds it.
+        Otherwise the bucket holding start is counted whole.
+        """
+        finer = self._FINER.get(unit)
+        if finer is None or not self._holds(finer, start):
+            return sum(count for moment, count in self.buckets(unit, start, end, action, errors))
+        seconds = self._layout[unit][0]
+        edge = _EPOCH + timedelta(seconds=(int((start - _EPOCH).total_seconds() // seconds) + 1) * seconds)
+        total = self.count(finer, start, edge - timedelta(microseconds=1), action, errors)
+        if edge <= (end or datetime.now()):
+            total += sum(count for moment, count in self.buckets(unit, edge, end, action, errors))
+        return total
@@ -2,6 +2,8 @@ import os
 import json
 import threading
 import hashlib
+import heapq
+import gzip
 from datetime import datetime, timedelta
 from collections import Counter
 from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, get_flashed_messages, make_response, send_file
@@ -14,6 +16,19 @@ from werkzeug.utils import secure_filename
 from werkzeug.utils import secure_filename
 from werkzeug.middleware.proxy_fix import ProxyFix
 from whitenoise import WhiteNoise
+from plant_store import PlantStore, SqlPlantStore
+from search_index import QueryCache
+import query_language
+from data_version import DataVersion
+from activity_counters import ActivityCounters
+from log_segments import LogSegments
+from log_store import LogStore
+from log_writer import LogWriter
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
 
 # Database models
 db = SQLAlchemy()
@@ -29,13 +44,66 @@ class User(db.Model):
     def __repr__(self):
         return '<User %r>' % self.username
 
+class Plant(db.Model):
+    id = db.Column(db.String(100), primary_key=True)
+    position = db.Column(db.Integer, index=True)  # order in the dataset
+    common_name = db.Column(db.String(200), index=True)
+    scientific_name = db.Column(db.String(200), index=True)
+    date_added = db.Column(db.String(10), index=True)
+    views = db.Column(db.Integer, default=0, index=True)
+    moderated = db.Column(db.Boolean, default=False, index=True)
+    medicinal_uses = db.Column(db.Text)
+    preparation_method = db.Column(db.Text)
+    parts_used = db.Column(db.Text)
+    region = db.Column(db.Text)
+    habitat = db.Column(db.Text)
+    precautions = db.Column(db.Text)
+    image_url = db.Column(db.String(500))
+    data = db.Column(db.Text, nullable=False)  # full plant record as JSON
+
+    def __repr__(self):
+        return '<Plant %r>' % self.id
+
 # Configuration
 # Configuration
 WRITABLE_DIR = '/tmp' if os.environ.get('VERCEL') else '.'
 
 USERS_FILE = os.path.join(WRITABLE_DIR, 'users.json')
 SETTINGS_FILE = os.path.join(WRITABLE_DIR, 'admin_settings.json')
+# Activity log segments; LOG_FILE is the old single-file log, imported on startup
+LOG_DIR = os.path.join(WRITABLE_DIR, 'logs')
 LOG_FILE = os.path.join(WRITABLE_DIR, 'logs.json')
+LOG_SEGMENT_BYTES = int(os.environ.get('LOG_SEGMENT_BYTES', 8 * 1024 * 1024))
+LOG_RETENTION_DAYS = int(os.environ.get('LOG_RETENTION_DAYS', 180))
+PLANTS_FILE = os.path.join('static', 'data', 'plants.json')
+# Other names (vernacular, Sanskrit, scientific synonyms) by plant id, for search
+PLANT_ALIASES_FILE = os.path.join('static', 'data', 'plant_aliases.json')
+# Shared plants/settings/logs generation counters for all gunicorn workers
+DATA_VERSION_FILE = os.path.join(WRITABLE_DIR, 'data_version')
+# Shared per-minute/hour/day activity counts behind the admin charts
+ACTIVITY_COUNTERS_FILE = os.path.join(WRITABLE_DIR, 'activity_counters')
+# 'json' (plants.json + journal) or 'sql' (Plant table)
+PLANT_STORAGE = os.environ.get('PLANT_STORAGE', 'json')
+# Search safety filters: a plant gets the flag when its precautions
+# mention none of the keywords
+SAFETY_KEYWORDS = {
+    'safe_pregnancy': ['pregnant', 'pregnancy', 'lactation', 'breast'],
+    'no_interactions': ['interact'],
+}
+# Per-worker cache of /api/search-plants responses
+SEARCH_CACHE_SIZE = int(os.environ.get('SEARCH_CACHE_SIZE', 512))
+SEARCH_CACHE_TTL = int(os.environ.get('SEARCH_CACHE_TTL', 300))
+# Most searches accepted by one /api/search-plants/batch request
+SEARCH_BATCH_LIMIT = 50
+# Similar plants shown on a detail page, and most one request may ask for
+SIMILAR_PLANTS = 4
+SIMILAR_PLANTS_LIMIT = 12
+# Most plants a server-side comparison (/api/compare-plants with matrix) takes
+COMPARE_MATRIX_LIMIT = 20
+# log_action entries are written in the background, once this many are
+# waiting or this many seconds after the first one
+LOG_BATCH_SIZE = int(os.environ.get('LOG_BATCH_SIZE', 100))
+LOG_FLUSH_INTERVAL = float(os.environ.get('LOG_FLUSH_INTERVAL', 1.0))
 USERS_LOCK = threading.Lock()
 SETTINGS_LOCK = threading.Lock()
 
@@ -59,6 +127,36 @@ def create_app():
     # Initialize database
     db.init_app(app)
 
+    # Plants dataset shared by all routes
+    data_version = DataVersion(DATA_VERSION_FILE)
+    try:
+        with open(PLANT_ALIASES_FILE, 'r', encoding='utf-8') as f:
+            plant_aliases = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Plant aliases not loaded: {e}")
+        plant_aliases = {}
+    if PLANT_STORAGE == 'sql':
+        plant_store = SqlPlantStore(db, Plant, data_version=data_version, safety_keywords=SAFETY_KEYWORDS,
+                                    aliases=plant_aliases)
+    else:
+        plant_store = PlantStore(PLANTS_FILE, data_version=data_version, safety_keywords=SAFETY_KEYWORDS,
+                                 aliases=plant_aliases)
+    search_cache = QueryCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL)
+    if not os.environ.get('VERCEL') and not os.path.exists('config'):
+        os.makedirs('config')
+    log_segments = LogSegments(LOG_DIR, max_bytes=LOG_SEGMENT_BYTES, retention_days=LOG_RETENTION_DAYS)
+    imported_logs = log_segments.import_json(LOG_FILE)
+    if imported_logs:
+        data_version.bump('logs')
+    log_writer = LogWriter(log_segments, batch_size=LOG_BATCH_SIZE, flush_interval=LOG_FLUSH_INTERVAL,
+                           on_flush=lambda: data_version.bump('logs'),
+                           background=not os.environ.get('VERCEL'))
+    log_store = LogStore(log_segments, data_version=data_version)
+    activity_counters = ActivityCounters(ACTIVITY_COUNTERS_FILE)
+    # Imported entries never went through log_action, so count them too
+    if imported_logs or not activity_counters.seeded:
+        activity_counters.rebuild(entry for moment, entry in log_store.timeline())
+
     
     
     # Add CSRF token function to template context
@@ -118,6 +216,19 @@ def create_app():
             db.session.add(admin_user)
             db.session.commit()
             print(f"Admin user created: username='{admin_username}', email='{admin_email}'")
+
+        # One-shot migration of plants.json into an empty Plant table
+        if PLANT_STORAGE == 'sql' and Plant.query.count() == 0:
+            plants = PlantStore(PLANTS_FILE).all()
+            plant_store.save(plants)
+            print(f"Migrated {len(plants)} plants from {PLANTS_FILE} into the database")
+
+    @app.cli.command('migrate-plants')
+    def migrate_plants():
+        """Copy plants.json (and its journal) into the Plant table."""
+        plants = PlantStore(PLANTS_FILE).all()
+        SqlPlantStore(db, Plant).save(plants)
+        print(f"Migrated {len(plants)} plants from {PLANTS_FILE} into the database")
     
     # Helper functions
     def login_required(f):
@@ -129,33 +240,19 @@ def create_app():
         return decorated_function
     
     def log_action(action, user=None, details=None):
-        """Log user actions"""
-        if not os.environ.get('VERCEL') and not os.path.exists('config'):
-            os.makedirs('config')
-        
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
+        """Log user actions (written to the log segments in the background)"""
+        now = datetime.now()
+        log_writer.append({
+            'timestamp': now.isoformat(),
             'action': action,
             'user': user,
             'details': details or {}
-        }
-        
-        logs = []
-        if os.path.exists(LOG_FILE):
-            try:
-                with open(LOG_FILE, 'r', encoding='utf-8') as f:
-                    logs = json.load(f)
-            except:
-                logs = []
-        
-        logs.append(log_entry)
-        
-        # Keep only last 1000 logs
-        if len(logs) > 1000:
-            logs = logs[-1000:]
-        
-        with open(LOG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(logs, f, indent=2, ensure_ascii=False)
+        })
+        activity_counters.add(action, now)
+
+    def load_logs():
+        """All kept log entries, oldest first (see LogStore for range queries)"""
+        return log_store.scan()
     
     def load_users():
         if not os.path.exists(USERS_FILE):
@@ -171,7 +268,17 @@ def create_app():
             with open(USERS_FILE, 'w') as f:
                 json.dump(users, f, indent=2)
     
+    # Settings cached per worker until any worker saves new ones
+    settings_cache = {'generation': None, 'settings': None}
+
     def load_settings():
+        generation = data_version.get('settings')
+        if settings_cache['settings'] is None or settings_cache['generation'] != generation:
+            settings_cache['settings'] = read_settings()
+            settings_cache['generation'] = generation
+        return dict(settings_cache['settings'])
+
+    def read_settings():
         if not os.path.exists(SETTINGS_FILE):
             # Default settings
             settings = {
@@ -197,6 +304,7 @@ def create_app():
         with SETTINGS_LOCK:
             with open(SETTINGS_FILE, 'w') as f:
                 json.dump(settings, f, indent=2)
+        data_version.bump('settings')
     
     def csrf_required(f):
         @wraps(f)
@@ -221,138 +329,159 @@ def create_app():
     @app.route('/')
     def index():
         """Render the home page with featured plants."""
-        try:
-            with open('static/data/plants.json', 'r') as f:
-                plants = json.load(f)
-                # Get 6 most recently added plants as featured plants
-                featured_plants = sorted(
-                    [p for p in plants if 'date_added' in p],
-                    key=lambda p: p.get('date_added', ''),
-                    reverse=True
-                )[:6]
-        except (FileNotFoundError, json.JSONDecodeError):
-            plants = []
-            featured_plants = []
+        plants = plant_store.all()
+        # Get 6 most recently added plants as featured plants
+        featured_plants = sorted(
+            [p for p in plants if 'date_added' in p],
+            key=lambda p: p.get('date_added', ''),
+            reverse=True
+        )[:6]
         return render_template('main/index.html', plants=plants, featured_plants=featured_plants)
 
     @app.route('/search', endpoint='search_page')
     def search_page():
         """Render the search page."""
         query = request.args.get('q', '')
-        
-        try:
-            with open('static/data/plants.json', 'r') as f:
-                plants = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            plants = []
-
-        regions = sorted(list(set(p['region'] for p in plants if 'region' in p)))
-        habitats = sorted(list(set(p['habitat'] for p in plants if 'habitat' in p and p['habitat'].strip())))
-        preparation_methods = sorted(list(set(p['preparation_method'] for p in plants if 'preparation_method' in p and p['preparation_method'].strip())))
-        parts_used = sorted(list(set(p['parts_used'] for p in plants if 'parts_used' in p)))
-        
-        # Extract unique medicinal uses (splitting by comma if needed)
-        medicinal_uses = set()
-        for p in plants:
-            if 'medicinal_uses' in p:
-                # Split by comma and strip whitespace
-                uses = [use.strip() for use in p['medicinal_uses'].split(',')]
-                medicinal_uses.update(uses)
-        
-        medicinal_uses = sorted(list(medicinal_uses))
+        # Filter choices are fetched by search.js from /api/search-facets
+        return render_template('main/search.html', query=query)
+
+    def search_facets():
+        """Filter choices for the search page, with plant counts, from the search index."""
+        vocabulary = plant_store.facet_vocabulary()
+        names = {
+            'region': 'regions',
+            'habitat': 'habitats',
+            'preparation_method': 'preparation_methods',
+            'parts_used': 'parts_used',
+            # Comma-separated uses are split into single uses
+            'medicinal_uses': 'medicinal_uses',
+        }
+        return {name: [{'value': value, 'count': count} for value, count in vocabulary[facet] if value.strip()]
+                for facet, name in names.items()}
+
+    @app.route('/api/search-facets')
+    def api_search_facets():
+        """Search page filter choices with plant counts (JSON)."""
+        return jsonify(search_facets())
+
+
+    def normalize_search_filters(filters):
+        """Drop empty filters and order facet values so equal searches look equal."""
+        normalized = {}
+        for name in ('region', 'habitat', 'preparation_method', 'parts_used', 'medicinal_uses'):
+            values = filters.get(name)
+            if values:
+                normalized[name] = sorted(set(values))
+        for name in ('has_image',) + tuple(SAFETY_KEYWORDS):
+            if filters.get(name):
+                normalized[name] = True
+        return normalized
+
+    def parse_search_request(data):
+        """Normalized search parameters from a /api/search-plants request body."""
+        return {
+            # Plain text or the query language (use:fever AND region:asia ...)
+            'query': query_language.normalize(data.get('query') or ''),
+            'filters': normalize_search_filters(data.get('filters', {})),
+            'sort': data.get('sort', 'relevance'),
+            'page': int(data.get('page', 1)),
+            'per_page': int(data.get('per_page', 12)),
+            # Opaque keyset cursor from a previous response ('next_cursor'),
+            # an alternative to page for infinite scrolling
+            'cursor': data.get('cursor'),
+        }
 
-        return render_template('main/search.html', query=query, regions=regions, habitats=habitats, 
-                             preparation_methods=preparation_methods, parts_used=parts_used, 
-                             medicinal_uses=medicinal_uses)
+    def search_args(params, query=None):
+        """plant_store.search() arguments for parsed search parameters."""
+        start = (params['page'] - 1) * params['per_page']
+        return (query or params['query'], params['filters'], params['sort'],
+                start, params['per_page'], params['cursor'])
+
+    def search_response(params, result, did_you_mean=None):
+        paged_results, total, facets, next_cursor = result
+        page = params['page']
+        per_page = params['per_page']
+        cursor = params['cursor']
+        end = page * per_page
+        return {
+            'plants': paged_results,
+            'total': total,
+            'pagination': {
+                'current_page': page,
+                'per_page': per_page,
+                'total_pages': (total + per_page - 1) // per_page,
+                'has_prev': page > 1 or bool(cursor),
+                'has_next': next_cursor is not None if cursor else end < total
+            },
+            'next_cursor': next_cursor,
+            'facets': facets,
+            'did_you_mean': did_you_mean
+        }
 
+    def corrected_search(params, result):
+        """Retry a search that found nothing with the spelling-corrected query."""
+        if result[1] == 0 and params['query']:
+            correction = plant_store.correct(params['query'])
+            if correction:
+                corrected = plant_store.search(*search_args(params, correction))
+                if corrected[1]:
+                    return corrected, correction
+        return result, None
 
     @app.route('/api/search-plants', methods=['POST'])
     def api_search_plants():
         data = request.get_json()
-        query = (data.get('query') or '').lower()
-        filters = data.get('filters', {})
-        sort = data.get('sort', 'relevance')
-        page = int(data.get('page', 1))
-        per_page = int(data.get('per_page', 12))
+        params = parse_search_request(data)
+
+        version = plant_store.version
+        cache_key = QueryCache.key(params)
+        cached = search_cache.get(cache_key, version)
+        if cached is not None:
+            return jsonify(cached)
 
         try:
-            with open('static/data/plants.json', 'r') as f:
-                plants = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            plants = []
+            result = plant_store.search(*search_args(params))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
-        # Filter by search query
-        if query:
-            plants = [p for p in plants if
-                      (query in p.get('common_name', '').lower()) or
-                      (query in p.get('scientific_name', '').lower()) or
-                      (query in p.get('medicinal_uses', '').lower())]
-
-        # Filter by region
-        region_filter = filters.get('region')
-        if region_filter:
-            plants = [p for p in plants if p.get('region') and any(region in p.get('region') for region in region_filter)]
-
-        # Filter by habitat
-        habitat_filter = filters.get('habitat')
-        if habitat_filter:
-            plants = [p for p in plants if p.get('habitat') and any(habitat in p.get('habitat') for habitat in habitat_filter)]
-
-        # Filter by preparation method
-        prep_filter = filters.get('preparation_method')
-        if prep_filter:
-            plants = [p for p in plants if p.get('preparation_method') and any(prep in p.get('preparation_method') for prep in prep_filter)]
-
-        # Filter by parts used
-        parts_used_filter = filters.get('parts_used')
-        if parts_used_filter:
-            plants = [p for p in plants if p.get('parts_used') and any(part in p.get('parts_used') for part in parts_used_filter)]
-
-        # Filter by medicinal uses
-        medicinal_uses_filter = filters.get('medicinal_uses')
-        if medicinal_uses_filter:
-            plants = [p for p in plants if p.get('medicinal_uses') and any(use.lower() in p.get('medicinal_uses').lower() for use in medicinal_uses_filter)]
-        
-        # Filter by image presence
-        if filters.get('has_image'):
-            plants = [p for p in plants if p.get('image_url')]
+        # Nothing found: retry with the spelling-corrected query
+        result, did_you_mean = corrected_search(params, result)
 
-        # Safety filters - check precautions field
-        if filters.get('safe_pregnancy'):
-            plants = [p for p in plants if not any(word in p.get('precautions', '').lower() for word in ['pregnant', 'pregnancy', 'lactation', 'breast'])]
+        response = search_response(params, result, did_you_mean)
+        search_cache.put(cache_key, version, response)
+        return jsonify(response)
 
-        if filters.get('no_interactions'):
-            plants = [p for p in plants if 'interact' not in p.get('precautions', '').lower()]
+    @app.route('/api/search-plants/batch', methods=['POST'])
+    def api_search_plants_batch():
+        """Run several searches (each a /api/search-plants body) in one request."""
+        data = request.get_json() or {}
+        searches = data.get('searches')
+        if not isinstance(searches, list) or not searches:
+            return jsonify({'error': 'searches must be a non-empty list'}), 400
+        if len(searches) > SEARCH_BATCH_LIMIT:
+            return jsonify({'error': f'At most {SEARCH_BATCH_LIMIT} searches per batch'}), 400
+        if not all(isinstance(spec, dict) for spec in searches):
+            return jsonify({'error': 'Each search must be an object'}), 400
 
-        # Sorting
-        if sort == 'name':
-            plants.sort(key=lambda x: x['common_name'])
-        elif sort == 'name-desc':
-            plants.sort(key=lambda x: x['common_name'], reverse=True)
-        elif sort == 'newest':
-            plants.sort(key=lambda x: x.get('date_added', ''), reverse=True)
-        elif sort == 'popular':
-            plants.sort(key=lambda x: x.get('views', 0), reverse=True)
-
-        total = len(plants)
-        # Pagination
-        start = (page - 1) * per_page
-        end = start + per_page
-        paged_results = plants[start:end]
-
-        response = {
-            'plants': paged_results,
-            'total': total,
-            'pagination': {
-                'current_page': page,
-                'per_page': per_page,
-                'total_pages': (total + per_page - 1) // per_page,
-                'has_prev': page > 1,
-                'has_next': end < total
-            },
-            'did_you_mean': None  # Placeholder for 'did you mean' feature
-        }
-        return jsonify(response)
+        try:
+            all_params = [parse_search_request(spec) for spec in searches]
+            version = plant_store.version
+            cache_keys = [QueryCache.key(params) for params in all_params]
+            responses = [search_cache.get(key, version) for key in cache_keys]
+
+            # Everything not cached runs against the same snapshot, sharing
+            # text matches and filter bitmaps between searches
+            pending = [i for i, response in enumerate(responses) if response is None]
+            results = plant_store.search_many([search_args(all_params[i]) for i in pending])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        for i, result in zip(pending, results):
+            result, did_you_mean = corrected_search(all_params[i], result)
+            responses[i] = search_response(all_params[i], result, did_you_mean)
+            search_cache.put(cache_keys[i], version, responses[i])
+
+        return jsonify({'results': responses})
 
 
     @app.route('/api/search-suggestions', methods=['GET'])
@@ -361,51 +490,43 @@ def create_app():
         if not query or len(query) < 2:
             return jsonify([])
 
-        try:
-            with open('static/data/plants.json', 'r') as f:
-                plants = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return jsonify([])
+        # Limit to 5 suggestions
+        suggestions = [{'type': 'plant', 'value': common_name, 'id': plant_id}
+                       for kind, common_name, plant_id in plant_store.suggest(query, ('common_name',), 5)]
 
-        suggestions = []
-        seen = set()
-
-        for p in plants:
-            common_name = p.get('common_name', '')
-            if query in common_name.lower():
-                if common_name not in seen:
-                    suggestions.append({'type': 'plant', 'value': common_name, 'id': p.get('id')})
-                    seen.add(common_name)
-            
-            # Limit to 5 suggestions
-            if len(suggestions) >= 5:
-                break
-                
         return jsonify(suggestions)
 
     @app.route('/api/compare-plants', methods=['POST'])
     def api_compare_plants():
-        """Compare multiple plants side-by-side"""
+        """Compare multiple plants side-by-side.
+
+        With "matrix": true the comparison (shared and unique uses, region
+        overlaps, precaution conflicts) is computed here and only plant
+        names are returned instead of the full records.
+        """
         data = request.get_json()
         plant_ids = data.get('plant_ids', [])
         
         if not plant_ids or len(plant_ids) < 2:
             return jsonify({'error': 'Please select at least 2 plants to compare'}), 400
+        if data.get('matrix') and len(plant_ids) > COMPARE_MATRIX_LIMIT:
+            return jsonify({'error': f'At most {COMPARE_MATRIX_LIMIT} plants can be compared at once'}), 400
         
         try:
-            with open('static/data/plants.json', 'r') as f:
-                all_plants = json.load(f)
-            
-            # Filter to only requested plants and maintain order
-            plants_ordered = []
-            for plant_id in plant_ids:
-                plant = next((p for p in all_plants if p.get('id') == plant_id), None)
-                if plant:
-                    plants_ordered.append(plant)
+            # Look up only the requested plants and maintain order
+            plants_ordered = plant_store.get_many(plant_ids)
             
             if len(plants_ordered) == 0:
                 return jsonify({'error': 'No matching plants found'}), 404
             
+            if data.get('matrix'):
+                return jsonify({
+                    'success': True,
+                    'plants': [{'id': plant.get('id'), 'common_name': plant.get('common_name'),
+                                'scientific_name': plant.get('scientific_name')} for plant in plants_ordered],
+                    'comparison': plant_store.compare([plant.get('id') for plant in plants_ordered])
+                })
+
             return jsonify({
                 'success': True,
                 'plants': plants_ordered
@@ -420,28 +541,60 @@ def create_app():
         
         # If a plant ID is requested, load and display that plant
         plant = None
+        similar_plants = []
         if plant_id:
-            try:
-                with open('static/data/plants.json', 'r', encoding='utf-8') as f:
-                    plants_data = json.load(f)
-                    plant = next((p for p in plants_data if p.get('id') == plant_id), None)
-            except (FileNotFoundError, json.JSONDecodeError):
-                pass
+            plant = plant_store.get(plant_id)
+            if plant:
+                similar_plants = [similar for similar, score in plant_store.similar(plant_id, SIMILAR_PLANTS)]
         
         return render_template('main/plants.html', 
                              template_folder=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates'),
                              plant=plant,
-                             plant_id=plant_id)
+                             plant_id=plant_id,
+                             similar_plants=similar_plants)
     
+    # Serialized plants list, rebuilt once per dataset version
+    plants_payload = {}
+
+    def plants_json_response():
+        """Return the full plants list as cached, ETag'd and compressed JSON."""
+        version = plant_store.version
+        payload = plants_payload.get('current')
+        if payload is None or version is None or payload['version'] != version:
+            body = jsonify(plant_store.all()).get_data()
+            payload = {
+                'version': version,
+                'etag': hashlib.sha256(body).hexdigest()[:32],
+                'identity': body,
+            }
+            plants_payload['current'] = payload
+
+        encoding = 'identity'
+        if brotli is not None and request.accept_encodings['br']:
+            encoding = 'br'
+        elif request.accept_encodings['gzip']:
+            encoding = 'gzip'
+        etag = payload['etag'] if encoding == 'identity' else f"{payload['etag']}-{encoding}"
+
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            if encoding not in payload:
+                if encoding == 'br':
+                    payload['br'] = brotli.compress(payload['identity'], quality=5)
+                else:
+                    payload['gzip'] = gzip.compress(payload['identity'], compresslevel=6)
+            response = app.response_class(payload[encoding], mimetype='application/json')
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
     @app.route('/plants')
     def plants():
-        try:
-            with open(os.path.join(app.static_folder, 'data', 'plants.json'), 'r', encoding='utf-8') as f:
-                plants = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Error loading plants: {e}")
-            plants = []
-        return jsonify(plants)
+        return plants_json_response()
 
     @app.route('/plant/<string:plant_id>')
     def plant_details(plant_id):
@@ -581,12 +734,8 @@ def create_app():
         }
         
         # Load plants count
-        try:
-            with open('static/data/plants.json', 'r') as f:
-                plants = json.load(f)
-                stats['total_plants'] = len(plants)
-        except (FileNotFoundError, json.JSONDecodeError):
-            plants = []
+        plants = plant_store.all()
+        stats['total_plants'] = len(plants)
         
         # Load users
         users = User.query.all()
@@ -597,15 +746,6 @@ def create_app():
         # Load settings
         settings = load_settings()
 
-        # Load logs
-        logs = []
-        if os.path.exists(LOG_FILE):
-            try:
-                with open(LOG_FILE, 'r', encoding='utf-8') as f:
-                    logs = json.load(f)
-            except Exception as e:
-                print(f"Error loading logs: {e}")
-
         # Load visit and plant stats for charts
         visit_stats = {
             'labels': json.dumps(['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']),
@@ -624,7 +764,6 @@ def create_app():
                             current_user=current_user,
                             notifications=notifications,
                             settings=settings,
-                            logs=logs,
                             visit_stats=visit_stats,
                             plant_stats=plant_stats,
                             section='dashboard')
@@ -634,24 +773,22 @@ def create_app():
     # API Routes
     @app.route('/api/plants')
     def api_plants():
-        try:
-            with open('static/data/plants.json', 'r') as f:
-                plants = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            plants = []
-        return jsonify(plants)
+        return plants_json_response()
 
     @app.route('/api/plants/<string:plant_id>')
     def api_plant(plant_id):
-        try:
-            with open('static/data/plants.json', 'r') as f:
-                plants = json.load(f)
-            plant = next((p for p in plants if p['id'] == plant_id), None)
-            if plant:
-                return jsonify(plant)
+        plant = plant_store.get(plant_id)
+        if plant:
+            return jsonify(plant)
+        return jsonify({'error': 'Plant not found'}), 404
+
+    @app.route('/api/plants/<string:plant_id>/similar')
+    def api_similar_plants(plant_id):
+        """Plants most alike in medicinal uses, parts used, preparation and region."""
+        if not plant_store.get(plant_id):
             return jsonify({'error': 'Plant not found'}), 404
-        except (FileNotFoundError, json.JSONDecodeError):
-            return jsonify({'error': 'Plants data not found'}), 404
+        limit = min(max(request.args.get('limit', SIMILAR_PLANTS, type=int), 1), SIMILAR_PLANTS_LIMIT)
+        return jsonify([dict(plant, similarity=score) for plant, score in plant_store.similar(plant_id, limit)])
     
     @app.route('/api/upload-image', methods=['POST'])
     @login_required
@@ -677,13 +814,8 @@ def create_app():
     @login_required
     def api_add_plant():
         try:
-            plants = []
-            if os.path.exists('static/data/plants.json'):
-                with open('static/data/plants.json', 'r') as f:
-                    plants = json.load(f)
-
             new_plant = {
-                "id": request.form.get('id') or str(len(plants) + 1),
+                "id": request.form.get('id') or None,
                 "common_name": request.form['common_name'],
                 "scientific_name": request.form['scientific_name'],
                 "medicinal_uses": request.form.get('medicinal_uses', ''),
@@ -696,10 +828,8 @@ def create_app():
                 "image_url": request.form.get('image_url', ''),
                 "date_added": datetime.now().strftime('%Y-%m-%d')
             }
-            plants.append(new_plant)
-
-            with open('static/data/plants.json', 'w') as f:
-                json.dump(plants, f, indent=2)
+            if plant_store.create(new_plant) is None:
+                return jsonify({'error': 'A plant with this ID already exists'}), 400
 
             log_action('add_plant', session.get('username'), {'plant_name': new_plant['common_name']})
             return jsonify(new_plant), 201
@@ -711,11 +841,6 @@ def create_app():
     @csrf_required
     def api_update_plant(plant_id):
         try:
-            plants = []
-            if os.path.exists('static/data/plants.json'):
-                with open('static/data/plants.json', 'r') as f:
-                    plants = json.load(f)
-
             updated_plant_data = {
                 "common_name": request.form.get('common_name'),
                 "scientific_name": request.form.get('scientific_name'),
@@ -739,22 +864,11 @@ def create_app():
                     updated_plant_data['image_url'] = url_for('static', filename=f'images/uploads/{filename}', _external=True)
 
 
-            found = False
-            for i, plant in enumerate(plants):
-                if plant['id'] == plant_id:
-                    # Update only provided fields, keep existing if not provided
-                    for key, value in updated_plant_data.items():
-                        if value is not None:
-                            plants[i][key] = value
-                    found = True
-                    break
-
-            if not found:
+            # Update only provided fields, keep existing if not provided
+            changes = {key: value for key, value in updated_plant_data.items() if value is not None}
+            if plant_store.update(plant_id, changes) is None:
                 return jsonify({'error': 'Plant not found'}), 404
 
-            with open('static/data/plants.json', 'w') as f:
-                json.dump(plants, f, indent=2)
-
             log_action('update_plant', session.get('username'), {'plant_id': plant_id, 'updated_data': updated_plant_data.get('common_name', 'N/A')})
             return jsonify({'success': True, 'message': 'Plant updated successfully'}), 200
         except Exception as e:
@@ -765,20 +879,9 @@ def create_app():
     @csrf_required
     def api_delete_plant(plant_id):
         try:
-            plants = []
-            if os.path.exists('static/data/plants.json'):
-                with open('static/data/plants.json', 'r') as f:
-                    plants = json.load(f)
-
-            initial_len = len(plants)
-            plants = [plant for plant in plants if plant['id'] != plant_id]
-
-            if len(plants) == initial_len:
+            if not plant_store.delete(plant_id):
                 return jsonify({'error': 'Plant not found'}), 404
 
-            with open('static/data/plants.json', 'w') as f:
-                json.dump(plants, f, indent=2)
-
             log_action('delete_plant', session.get('username'), {'plant_id': plant_id})
             return jsonify({'success': True, 'message': 'Plant deleted successfully'}), 200
         except Exception as e:
@@ -795,22 +898,13 @@ def create_app():
             if not ids_to_delete:
                 return jsonify({'error': 'No plant IDs provided'}), 400
 
-            plants = []
-            if os.path.exists('static/data/plants.json'):
-                with open('static/data/plants.json', 'r') as f:
-                    plants = json.load(f)
-
-            initial_len = len(plants)
-            plants = [plant for plant in plants if plant['id'] not in ids_to_delete]
+            num_deleted = plant_store.delete_many(ids_to_delete)
 
-            if len(plants) == initial_len:
+            if num_deleted == 0:
                 return jsonify({'error': 'No matching plants found for deletion'}), 404
 
-            with open('static/data/plants.json', 'w') as f:
-                json.dump(plants, f, indent=2)
-
             log_action('bulk_delete_plants', session.get('username'), {'deleted_ids': ids_to_delete})
-            return jsonify({'success': True, 'message': f'{initial_len - len(plants)} plants deleted successfully'}), 200
+            return jsonify({'success': True, 'message': f'{num_deleted} plants deleted successfully'}), 200
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
@@ -821,17 +915,8 @@ def create_app():
         if not query:
             return jsonify([])
         
-        try:
-            with open('static/data/plants.json', 'r') as f:
-                plants = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            plants = []
-
         # Search in name, scientific name, and medicinal uses
-        filtered_plants = [p for p in plants if 
-                           (query.lower() in p.get('common_name', '').lower()) or 
-                           (query.lower() in p.get('scientific_name', '').lower()) or 
-                           (query.lower() in p.get('medicinal_uses', '').lower())]
+        filtered_plants = plant_store.match(query)
         
         log_action('search', session.get('username'), {'query': query})
         return jsonify(filtered_plants)
@@ -842,47 +927,9 @@ def create_app():
         if not query:
             return jsonify([])
         
-        try:
-            with open('static/data/plants.json', 'r') as f:
-                plants = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            plants = []
+        # Common names first, then matches at the start, then shorter ones
+        suggestion_list = plant_store.suggest(query, limit=10)
 
-        # Collect all possible suggestion sources
-        suggestions = set()
-        
-        # Search in common names, scientific names, and medicinal uses
-        for plant in plants:
-            # Add common name suggestions
-            common_name = plant.get('common_name', '').lower()
-            if query in common_name:
-                suggestions.add(('common_name', plant['common_name']))
-            
-            # Add scientific name suggestions
-            scientific_name = plant.get('scientific_name', '').lower()
-            if query in scientific_name:
-                suggestions.add(('scientific_name', plant['scientific_name']))
-            
-            # Add medicinal uses suggestions
-            medicinal_uses = plant.get('medicinal_uses', '').lower()
-            if query in medicinal_uses:
-                # Split medicinal uses into individual phrases
-                uses = [use.strip() for use in medicinal_uses.split(',')]
-                for use in uses:
-                    if query in use and len(use) >= len(query):
-                        suggestions.add(('medicinal_use', use.strip().capitalize()))
-            
-            # Add region suggestions
-            region = plant.get('region', '').lower()
-            if query in region:
-                suggestions.add(('region', plant['region']))
-        
-        # Convert suggestions to list and sort by relevance
-        suggestion_list = sorted(list(suggestions), 
-                               key=lambda x: (x[0] != 'common_name', # Common names first
-                                           not x[1].lower().startswith(query), # Exact matches first
-                                           len(x[1]))) # Shorter suggestions first
-        
         # Format suggestions with type and value
         formatted_suggestions = [
             {
@@ -890,7 +937,7 @@ def create_app():
                 'value': s[1],
                 'display': f"{s[1]} ({s[0].replace('_', ' ').title()})"
             } 
-            for s in suggestion_list[:10]  # Limit to 10 suggestions
+            for s in suggestion_list
         ]
         
         return jsonify(formatted_suggestions)
@@ -1046,23 +1093,22 @@ def create_app():
             previous_year_start = current_year_start.replace(year=current_year_start.year - 1)
 
             # Calculate plant growth
-            with open('static/data/plants.json', 'r') as f:
-                plants = json.load(f)
-                for plant in plants:
-                    if 'date_added' in plant:
-                        date_added = datetime.strptime(plant['date_added'], '%Y-%m-%d')
-                        
-                        # Monthly growth
-                        if date_added >= current_month_start:
-                            monthly_growth['plants']['current'] += 1
-                        elif previous_month_start <= date_added < current_month_start:
-                            monthly_growth['plants']['previous'] += 1
+            plants = plant_store.all()
+            for plant in plants:
+                if 'date_added' in plant:
+                    date_added = datetime.strptime(plant['date_added'], '%Y-%m-%d')
+                    
+                    # Monthly growth
+                    if date_added >= current_month_start:
+                        monthly_growth['plants']['current'] += 1
+                    elif previous_month_start <= date_added < current_month_start:
+                        monthly_growth['plants']['previous'] += 1
 
-                        # Yearly growth
-                        if date_added >= current_year_start:
-                            yearly_growth['plants']['current'] += 1
-                        elif previous_year_start <= date_added < current_year_start:
-                            yearly_growth['plants']['previous'] += 1
+                    # Yearly growth
+                    if date_added >= current_year_start:
+                        yearly_growth['plants']['current'] += 1
+                    elif previous_year_start <= date_added < current_year_start:
+                        yearly_growth['plants']['previous'] += 1
 
             # Calculate user growth
             all_users = User.query.all()
@@ -1090,20 +1136,12 @@ def create_app():
             # Calculate weekly visits from logs
             weekly_visits = [0] * 7  # One entry for each day of the week
             try:
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
-                    week_ago = datetime.now() - timedelta(days=7)
+                week_ago = datetime.now() - timedelta(days=7)
                     
-                    for log in logs:
-                        if log['action'] == 'login':
-                            try:
-                                log_date = datetime.fromisoformat(log['timestamp'])
-                                if log_date >= week_ago:
-                                    # Get day index (0 = Monday, 6 = Sunday)
-                                    day_index = log_date.weekday()
-                                    weekly_visits[day_index] += 1
-                            except ValueError:
-                                continue
+                for hour, count in activity_counters.buckets('hour', week_ago, action='login'):
+                    # Get day index (0 = Monday, 6 = Sunday)
+                    day_index = hour.weekday()
+                    weekly_visits[day_index] += count
             except Exception as e:
                 print(f"Error processing logs for weekly visits: {e}")
 
@@ -1120,41 +1158,40 @@ def create_app():
             monthly_trends = {}
             
             try:
-                with open('static/data/plants.json', 'r') as f:
-                    plants = json.load(f)
-                    for plant in plants:
-                        # Determine category
-                        category = 'Others'
-                        description = plant.get('description', '').lower()
-                        
-                        if any(word in description for word in ['herb', 'herbal', 'herbaceous']):
-                            category = 'Herbs'
-                        elif any(word in description for word in ['tree', 'tall']):
-                            category = 'Trees'
-                        elif any(word in description for word in ['shrub', 'bush']):
-                            category = 'Shrubs'
-                        elif any(word in description for word in ['climber', 'vine', 'creeper']):
-                            category = 'Climbers'
-                        
-                        plant_categories[category] += 1
-
-                        # Add to monthly trends if date is available
-                        if 'date_added' in plant:
-                            try:
-                                date_added = datetime.strptime(plant['date_added'], '%Y-%m-%d')
-                                month_key = date_added.strftime('%Y-%m')
-                                
-                                if month_key not in monthly_trends:
-                                    monthly_trends[month_key] = {
-                                        'Herbs': 0,
-                                        'Trees': 0,
-                                        'Shrubs': 0,
-                                        'Climbers': 0,
-                                        'Others': 0
-                                    }
-                                monthly_trends[month_key][category] += 1
-                            except ValueError:
-                                continue
+                plants = plant_store.all()
+                for plant in plants:
+                    # Determine category
+                    category = 'Others'
+                    description = plant.get('description', '').lower()
+                    
+                    if any(word in description for word in ['herb', 'herbal', 'herbaceous']):
+                        category = 'Herbs'
+                    elif any(word in description for word in ['tree', 'tall']):
+                        category = 'Trees'
+                    elif any(word in description for word in ['shrub', 'bush']):
+                        category = 'Shrubs'
+                    elif any(word in description for word in ['climber', 'vine', 'creeper']):
+                        category = 'Climbers'
+                    
+                    plant_categories[category] += 1
+
+                    # Add to monthly trends if date is available
+                    if 'date_added' in plant:
+                        try:
+                            date_added = datetime.strptime(plant['date_added'], '%Y-%m-%d')
+                            month_key = date_added.strftime('%Y-%m')
+                            
+                            if month_key not in monthly_trends:
+                                monthly_trends[month_key] = {
+                                    'Herbs': 0,
+                                    'Trees': 0,
+                                    'Shrubs': 0,
+                                    'Climbers': 0,
+                                    'Others': 0
+                                }
+                            monthly_trends[month_key][category] += 1
+                        except ValueError:
+                            continue
             except Exception as e:
                 print(f"Error processing plant categories: {e}")
 
@@ -1173,14 +1210,13 @@ def create_app():
             # Calculate medicinal uses statistics
             medicinal_uses = {}
             try:
-                with open('static/data/plants.json', 'r') as f:
-                    plants = json.load(f)
-                    for plant in plants:
-                        uses = plant.get('medicinal_uses', '').split(',')
-                        for use in uses:
-                            use = use.strip().lower()
-                            if use:  # Skip empty strings
-                                medicinal_uses[use] = medicinal_uses.get(use, 0) + 1
+                plants = plant_store.all()
+                for plant in plants:
+                    uses = plant.get('medicinal_uses', '').split(',')
+                    for use in uses:
+                        use = use.strip().lower()
+                        if use:  # Skip empty strings
+                            medicinal_uses[use] = medicinal_uses.get(use, 0) + 1
                 
                 # Sort by frequency and get top 10
                 sorted_uses = sorted(medicinal_uses.items(), key=lambda x: x[1], reverse=True)
@@ -1204,31 +1240,30 @@ def create_app():
             }
 
             try:
-                with open('static/data/plants.json', 'r') as f:
-                    plants = json.load(f)
-                    for plant in plants:
-                        region = plant.get('region', '').strip()
-                        # Map common region names and variations
-                        region_mapping = {
-                            'asia': 'Asia',
-                            'african': 'Africa',
-                            'africa': 'Africa',
-                            'europe': 'Europe',
-                            'european': 'Europe',
-                            'north america': 'North America',
-                            'american': 'North America',
-                            'south america': 'South America',
-                            'oceania': 'Oceania',
-                            'australia': 'Oceania',
-                            'pacific': 'Oceania'
-                        }
-                        
-                        region_lower = region.lower()
-                        for key, value in region_mapping.items():
-                            if key in region_lower:
-                                region_distribution[value] += 1
-                                break
-                        
+                plants = plant_store.all()
+                for plant in plants:
+                    region = plant.get('region', '').strip()
+                    # Map common region names and variations
+                    region_mapping = {
+                        'asia': 'Asia',
+                        'african': 'Africa',
+                        'africa': 'Africa',
+                        'europe': 'Europe',
+                        'european': 'Europe',
+                        'north america': 'North America',
+                        'american': 'North America',
+                        'south america': 'South America',
+                        'oceania': 'Oceania',
+                        'australia': 'Oceania',
+                        'pacific': 'Oceania'
+                    }
+                    
+                    region_lower = region.lower()
+                    for key, value in region_mapping.items():
+                        if key in region_lower:
+                            region_distribution[value] += 1
+                            break
+                    
             except Exception as e:
                 print(f"Error processing region distribution: {e}")
 
@@ -1265,10 +1300,8 @@ def create_app():
             total_logs = 0
             error_count = 0
             try:
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
-                    total_logs = len(logs)
-                    error_count = len([log for log in logs if 'error' in log['action'].lower()])
+                total_logs = log_store.count()
+                error_count = log_store.count(errors=True)
             except Exception as e:
                 print(f"Error processing logs for report: {e}")
 
@@ -1289,9 +1322,8 @@ def create_app():
 
             # Plant Statistics
             try:
-                with open('static/data/plants.json', 'r') as f:
-                    plants = json.load(f)
-                    
+                plants = plant_store.all()
+                
                 # Get plants added in last 30 days
                 thirty_days_ago = (current_time - timedelta(days=30)).strftime('%Y-%m-%d')
                 recent_plants = [p for p in plants if p.get('date_added', '') >= thirty_days_ago]
@@ -1311,16 +1343,15 @@ def create_app():
 
             # Activity Statistics
             try:
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
-                    day_ago = (current_time - timedelta(days=1)).isoformat()
-                    week_ago = (current_time - timedelta(days=7)).isoformat()
+                day_ago = current_time - timedelta(days=1)
+                week_ago = current_time - timedelta(days=7)
                     
-                    report_data['activity_stats'] = {
-                        'logins_24h': len([log for log in logs if log['action'] == 'login' and log['timestamp'] > day_ago]),
-                        'searches_7d': len([log for log in logs if log['action'] == 'search' and log['timestamp'] > week_ago]),
-                        'plants_modified_7d': len([log for log in logs if log['action'] in ['add_plant', 'update_plant', 'delete_plant'] and log['timestamp'] > week_ago])
-                    }
+                report_data['activity_stats'] = {
+                    'logins_24h': activity_counters.count('minute', day_ago, current_time, action='login'),
+                    'searches_7d': activity_counters.count('hour', week_ago, current_time, action='search'),
+                    'plants_modified_7d': activity_counters.count('hour', week_ago, current_time,
+                                                                  action=('add_plant', 'update_plant', 'delete_plant'))
+                }
             except Exception as e:
                 print(f"Error processing activity stats for report: {e}")
                 report_data['activity_stats'] = {
@@ -1386,9 +1417,8 @@ def create_app():
             data_backup_dir = os.path.join(backup_dir, 'data')
             os.makedirs(data_backup_dir, exist_ok=True)
 
-            if os.path.exists('static/data/plants.json'):
-                with open('static/data/plants.json', 'r') as f_src:
-                    plants = json.load(f_src)
+            if os.path.exists(PLANTS_FILE):
+                plants = plant_store.all()
                 with open(os.path.join(data_backup_dir, 'plants.json'), 'w') as f_dst:
                     json.dump(plants, f_dst, indent=2)
 
@@ -1450,60 +1480,52 @@ def create_app():
 
             # Check system health and add notifications
             try:
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
-                    recent_logs = [log for log in logs if datetime.fromisoformat(log['timestamp']) > 
-                                (current_time - timedelta(hours=24))]
-                    error_logs = [log for log in recent_logs if 'error' in log['action'].lower()]
+                error_count = activity_counters.count('minute', current_time - timedelta(hours=24), current_time,
+                                                      errors=True)
                     
-                    if len(error_logs) > 5:
-                        notifications.append({
-                            'id': f'sys_health_{current_time.timestamp()}',
-                            'title': '⚠️ System Health Alert',
-                            'message': f'High error rate detected: {len(error_logs)} errors in the last 24 hours',
-                            'timestamp': current_time.isoformat(),
-                            'type': 'error',
-                            'read': False
-                        })
+                if error_count > 5:
+                    notifications.append({
+                        'id': f'sys_health_{current_time.timestamp()}',
+                        'title': '⚠️ System Health Alert',
+                        'message': f'High error rate detected: {error_count} errors in the last 24 hours',
+                        'timestamp': current_time.isoformat(),
+                        'type': 'error',
+                        'read': False
+                    })
             except Exception as e:
                 print(f"Error checking system health: {e}")
 
             # Check for inactive users
             try:
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
-                    active_users = set(log['user'] for log in logs 
-                                    if datetime.fromisoformat(log['timestamp']) > 
-                                    (current_time - timedelta(days=7)))
-                    all_users = set(user.username for user in User.query.all())
-                    inactive_users = all_users - active_users
+                active_users = log_store.users(current_time - timedelta(days=7))
+                all_users = set(user.username for user in User.query.all())
+                inactive_users = all_users - active_users
                     
-                    if inactive_users:
-                        notifications.append({
-                            'id': f'inactive_users_{current_time.timestamp()}',
-                            'title': '👥 Inactive Users',
-                            'message': f'{len(inactive_users)} users have not logged in for 7 days',
-                            'timestamp': current_time.isoformat(),
-                            'type': 'warning',
-                            'read': False
-                        })
+                if inactive_users:
+                    notifications.append({
+                        'id': f'inactive_users_{current_time.timestamp()}',
+                        'title': '👥 Inactive Users',
+                        'message': f'{len(inactive_users)} users have not logged in for 7 days',
+                        'timestamp': current_time.isoformat(),
+                        'type': 'warning',
+                        'read': False
+                    })
             except Exception as e:
                 print(f"Error checking inactive users: {e}")
 
             # Check for unmoderated plants
             try:
-                with open('static/data/plants.json', 'r') as f:
-                    plants = json.load(f)
-                    unmoderated = [p for p in plants if not p.get('moderated', False)]
-                    if unmoderated:
-                        notifications.append({
-                            'id': f'unmod_plants_{current_time.timestamp()}',
-                            'title': '🌱 Plants Pending Review',
-                            'message': f'{len(unmoderated)} plants need moderation',
-                            'timestamp': current_time.isoformat(),
-                            'type': 'info',
-                            'read': False
-                        })
+                plants = plant_store.all()
+                unmoderated = [p for p in plants if not p.get('moderated', False)]
+                if unmoderated:
+                    notifications.append({
+                        'id': f'unmod_plants_{current_time.timestamp()}',
+                        'title': '🌱 Plants Pending Review',
+                        'message': f'{len(unmoderated)} plants need moderation',
+                        'timestamp': current_time.isoformat(),
+                        'type': 'info',
+                        'read': False
+                    })
             except Exception as e:
                 print(f"Error checking unmoderated plants: {e}")
 
@@ -1564,8 +1586,7 @@ def create_app():
         try:
             if data_type == 'plants':
                 # Export plants data
-                with open('static/data/plants.json', 'r') as f:
-                    plants = json.load(f)
+                plants = plant_store.all()
                 
                 if format_type == 'json':
                     return jsonify(plants)
@@ -1608,23 +1629,20 @@ def create_app():
 
             elif data_type == 'logs':
                 # Export system logs
-                if os.path.exists(LOG_FILE):
-                    with open(LOG_FILE, 'r') as f:
-                        logs = json.load(f)
+                logs = load_logs()
 
-                    if format_type == 'json':
-                        return jsonify(logs)
-                    else:
-                        si = io.StringIO()
-                        writer = csv.DictWriter(si, fieldnames=['timestamp', 'action', 'user', 'details'])
-                        writer.writeheader()
-                        writer.writerows(logs)
-                        output = make_response(si.getvalue())
-                        output.headers['Content-Type'] = 'text/csv'
-                        output.headers['Content-Disposition'] = 'attachment; filename=system_logs.csv'
-                        return output
+                if format_type == 'json':
+                    return jsonify(logs)
                 else:
-                    return jsonify([])
+                    si = io.StringIO()
+                    writer = csv.DictWriter(si, fieldnames=['timestamp', 'action', 'user', 'details'],
+                                            extrasaction='ignore')
+                    writer.writeheader()
+                    writer.writerows(logs)
+                    output = make_response(si.getvalue())
+                    output.headers['Content-Type'] = 'text/csv'
+                    output.headers['Content-Disposition'] = 'attachment; filename=system_logs.csv'
+                    return output
 
             else:
                 return jsonify({'error': 'Invalid data type'}), 400
@@ -1643,31 +1661,21 @@ def create_app():
             data = request.get_json()
             approved = data.get('approved', False)
 
-            with open('static/data/plants.json', 'r') as f:
-                plants = json.load(f)
+            # Update the plant's moderation status
+            plant = plant_store.update(plant_id, {
+                'moderated': approved,
+                'moderated_by': session.get('username'),
+                'moderated_at': datetime.now().isoformat()
+            })
 
-            # Find the plant and update its moderation status
-            plant_found = False
-            for plant in plants:
-                if plant['id'] == plant_id:
-                    plant['moderated'] = approved
-                    plant['moderated_by'] = session.get('username')
-                    plant['moderated_at'] = datetime.now().isoformat()
-                    plant_found = True
-                    break
-
-            if not plant_found:
+            if plant is None:
                 return jsonify({'error': 'Plant not found'}), 404
 
-            # Save the updated plants data
-            with open('static/data/plants.json', 'w') as f:
-                json.dump(plants, f, indent=2)
-
             # Log the moderation action
             action = 'approve_plant' if approved else 'revoke_plant_approval'
             log_action(action, session.get('username'), {
                 'plant_id': plant_id,
-                'plant_name': next((p['common_name'] for p in plants if p['id'] == plant_id), None)
+                'plant_name': plant['common_name']
             })
 
             return jsonify({'success': True, 'message': 'Plant moderation status updated'})
@@ -1687,31 +1695,22 @@ def create_app():
             error_rate = 0
             error_rate_change = 0
             try:
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
+                # Get logs from last hour and previous hour
+                now = datetime.now()
+                hour_ago = now - timedelta(hours=1)
+                two_hours_ago = now - timedelta(hours=2)
                     
-                    # Get logs from last hour and previous hour
-                    now = datetime.now()
-                    hour_ago = now - timedelta(hours=1)
-                    two_hours_ago = now - timedelta(hours=2)
+                current_hour_logs = activity_counters.count('minute', hour_ago, now)
+                previous_hour_logs = activity_counters.count('minute', two_hours_ago, hour_ago)
                     
-                    current_hour_logs = [
-                        log for log in logs
-                        if datetime.fromisoformat(log['timestamp']) > hour_ago
-                    ]
-                    previous_hour_logs = [
-                        log for log in logs
-                        if two_hours_ago < datetime.fromisoformat(log['timestamp']) <= hour_ago
-                    ]
+                if current_hour_logs:
+                    current_errors = activity_counters.count('minute', hour_ago, now, errors=True)
+                    error_rate = (current_errors / current_hour_logs) * 100
                     
-                    if current_hour_logs:
-                        current_errors = len([log for log in current_hour_logs if 'error' in log['action'].lower()])
-                        error_rate = (current_errors / len(current_hour_logs)) * 100
-                    
-                    if previous_hour_logs:
-                        previous_errors = len([log for log in previous_hour_logs if 'error' in log['action'].lower()])
-                        previous_error_rate = (previous_errors / len(previous_hour_logs)) * 100
-                        error_rate_change = error_rate - previous_error_rate
+                if previous_hour_logs:
+                    previous_errors = activity_counters.count('minute', two_hours_ago, hour_ago, errors=True)
+                    previous_error_rate = (previous_errors / previous_hour_logs) * 100
+                    error_rate_change = error_rate - previous_error_rate
             except Exception as e:
                 print(f"Error calculating error rate: {e}")
 
@@ -1740,7 +1739,8 @@ def create_app():
                 'response_time': response_time,
                 'response_time_change': response_time_change,
                 'db_size': db_size,
-                'db_size_change': db_size_change
+                'db_size_change': db_size_change,
+                'search_cache': search_cache.stats()
             })
 
         except Exception as e:
@@ -1754,26 +1754,19 @@ def create_app():
             return jsonify({'error': 'Access denied'}), 403
 
         try:
-            error_logs = []
-            if os.path.exists(LOG_FILE):
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
-                    
-                    # Get errors from the last 24 hours
-                    day_ago = datetime.now() - timedelta(days=1)
-                    error_logs = [
-                        {
-                            'id': str(i),
-                            'timestamp': log['timestamp'],
-                            'message': log['action'],
-                            'details': str(log.get('details', {})),
-                            'acknowledged': log.get('acknowledged', False)
-                        }
-                        for i, log in enumerate(logs)
-                        if 'error' in log['action'].lower() and
-                        datetime.fromisoformat(log['timestamp']) > day_ago and
-                        not log.get('acknowledged', False)
-                    ]
+            # Get errors from the last 24 hours
+            day_ago = datetime.now() - timedelta(days=1)
+            error_logs = [
+                {
+                    'id': str(i),
+                    'timestamp': log['timestamp'],
+                    'message': log['action'],
+                    'details': str(log.get('details', {})),
+                    'acknowledged': log.get('acknowledged', False)
+                }
+                for i, log in enumerate(log_store.scan(day_ago, errors=True))
+                if not log.get('acknowledged', False)
+            ]
 
             return jsonify({'errors': error_logs})
 
@@ -1788,15 +1781,10 @@ def create_app():
             return jsonify({'error': 'Access denied'}), 403
 
         try:
-            if os.path.exists(LOG_FILE):
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
-                
-                # Keep non-error logs
-                filtered_logs = [log for log in logs if 'error' not in log['action'].lower()]
-                
-                with open(LOG_FILE, 'w') as f:
-                    json.dump(filtered_logs, f, indent=2)
+            # Hides the error entries logged so far (see load_logs)
+            log_writer.append({'timestamp': datetime.now().isoformat(), 'control': 'clear_errors'})
+            log_writer.flush()
+            activity_counters.rebuild(entry for moment, entry in log_store.timeline())
 
             return jsonify({'success': True})
 
@@ -1811,6 +1799,9 @@ def create_app():
             return jsonify({'error': 'Access denied'}), 403
 
         try:
+            # Fold the plants journal back into plants.json
+            plant_store.compact()
+
             # Vacuum the SQLite database
             db.session.execute('VACUUM')
             db.session.commit()
@@ -1877,17 +1868,9 @@ def create_app():
             return jsonify({'error': 'Access denied'}), 403
 
         try:
-            if os.path.exists(LOG_FILE):
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
-                
-                # Mark the error as acknowledged
-                for log in logs:
-                    if 'error' in log['action'].lower():
-                        log['acknowledged'] = True
-                
-                with open(LOG_FILE, 'w') as f:
-                    json.dump(logs, f, indent=2)
+            # Marks the error entries logged so far acknowledged (see load_logs)
+            log_writer.append({'timestamp': datetime.now().isoformat(), 'control': 'acknowledge_errors'})
+            log_writer.flush()
 
             return jsonify({'success': True})
 
@@ -1908,81 +1891,109 @@ def create_app():
             hourly_activity = [0] * 24
             hourly_labels = []
             try:
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
-                    day_ago = now - timedelta(days=1)
+                day_ago = now - timedelta(days=1)
                     
-                    # Create hour labels
-                    for i in range(24):
-                        hour = (now - timedelta(hours=24-i)).strftime('%H:00')
-                        hourly_labels.append(hour)
+                # Create hour labels
+                for i in range(24):
+                    hour = (now - timedelta(hours=24-i)).strftime('%H:00')
+                    hourly_labels.append(hour)
                     
-                    # Count activities per hour
-                    for log in logs:
-                        log_time = datetime.fromisoformat(log['timestamp'])
-                        if log_time > day_ago:
-                            hour_index = 23 - (now - log_time).seconds // 3600
-                            if 0 <= hour_index < 24:
-                                hourly_activity[hour_index] += 1
+                # Count activities per hour
+                for minute, count in activity_counters.buckets('minute', day_ago, now):
+                    hour_index = 23 - int((now - minute).total_seconds()) // 3600
+                    if 0 <= hour_index < 24:
+                        hourly_activity[hour_index] += count
             except Exception as e:
                 print(f"Error processing hourly activity: {e}")
 
-            # Get popular searches
-            popular_searches = []
+            # One pass over the log feeds the searches, recent activity,
+            # active users and session figures below. Each of them handles
+            # its own errors, so an entry one cannot use does not cut the
+            # others short
+            day_ago = now - timedelta(days=1)
+            week_ago = now - timedelta(days=7)
             search_terms = Counter()
+            user_activity = Counter()
+            latest = []  # min-heap of the 10 latest entries with a user
+            sessions = {}
+            active_sessions = 0
+            total_duration = timedelta()
+            session_count = 0
             try:
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
-                    week_ago = now - timedelta(days=7)
-                    
-                    for log in logs:
-                        if (log['action'] == 'search' and 
-                            datetime.fromisoformat(log['timestamp']) > week_ago and
-                            'details' in log and 'query' in log['details']):
-                            search_terms[log['details']['query']] += 1
-                    
-                    popular_searches = [
-                        {'term': term, 'count': count}
-                        for term, count in search_terms.most_common(10)
-                    ]
+                day_start = day_ago.timestamp()
+                week_start = week_ago.timestamp()
+                for i, (moment, log) in enumerate(log_store.timeline()):
+                    try:
+                        if log['user']:
+                            # Ties on timestamp go to the earlier entry, as a stable sort would
+                            item = (log['timestamp'], -i, log)
+                            if len(latest) < 10:
+                                heapq.heappush(latest, item)
+                            elif item > latest[0]:
+                                heapq.heapreplace(latest, item)
+                    except Exception as e:
+                        print(f"Error processing recent activity: {e}")
+
+                    try:
+                        if log['user'] and moment > day_start:
+                            user_activity[log['user']] += 1
+                    except Exception as e:
+                        print(f"Error processing user activity: {e}")
+
+                    try:
+                        if log['action'] == 'search':
+                            if moment > week_start and 'details' in log and 'query' in log['details']:
+                                search_terms[log['details']['query']] += 1
+                    except Exception as e:
+                        print(f"Error processing search terms: {e}")
+
+                    try:
+                        if log['action'] in ['login', 'logout'] and 'user' in log:
+                            user = log['user']
+                            log_time = datetime.fromisoformat(log['timestamp'])
+
+                            if log['action'] == 'login':
+                                sessions[user] = {'start': log_time}
+                                if log_time > day_ago:
+                                    active_sessions += 1
+                            elif log['action'] == 'logout' and user in sessions:
+                                if 'start' in sessions[user]:
+                                    duration = log_time - sessions[user]['start']
+                                    total_duration += duration
+                                    session_count += 1
+                                    del sessions[user]
+                    except Exception as e:
+                        print(f"Error processing sessions: {e}")
             except Exception as e:
-                print(f"Error processing search terms: {e}")
+                print(f"Error processing activity logs: {e}")
+
+            # Get popular searches
+            popular_searches = [
+                {'term': term, 'count': count}
+                for term, count in search_terms.most_common(10)
+            ]
 
             # Get recent activity
             recent_activity = []
-            try:
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
-                    recent_logs = sorted(
-                        [log for log in logs if log['user']],
-                        key=lambda x: x['timestamp'],
-                        reverse=True
-                    )[:10]
-                    
-                    for log in recent_logs:
-                        activity = {
-                            'timestamp': log['timestamp'],
-                            'action': log['action'],
-                            'details': str(log.get('details', ''))
-                        }
-                        recent_activity.append(activity)
-            except Exception as e:
-                print(f"Error processing recent activity: {e}")
+            for timestamp, _, log in sorted(latest, reverse=True):
+                activity = {
+                    'timestamp': log['timestamp'],
+                    'action': log['action'],
+                    'details': str(log.get('details', ''))
+                }
+                recent_activity.append(activity)
 
             # Get active users
             active_users = []
             try:
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
-                    day_ago = now - timedelta(days=1)
-                    
-                    user_activity = Counter(
-                        log['user'] for log in logs
-                        if datetime.fromisoformat(log['timestamp']) > day_ago and log['user']
-                    )
-                    
-                    for username, count in user_activity.most_common(5):
-                        user = User.query.filter_by(username=username).first()
+                top_users = user_activity.most_common(5)
+                if top_users:
+                    users_by_name = {
+                        user.username: user
+                        for user in User.query.filter(User.username.in_([name for name, _ in top_users])).all()
+                    }
+                    for username, count in top_users:
+                        user = users_by_name.get(username)
                         if user:
                             active_users.append({
                                 'username': user.username,
@@ -2006,73 +2017,25 @@ def create_app():
                 print(f"Error processing recent users: {e}")
 
             # Get search analytics
-            search_analytics = []
-            try:
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
-                    week_ago = now - timedelta(days=7)
-                    
-                    searches = Counter()
-                    for log in logs:
-                        if (log['action'] == 'search' and 
-                            datetime.fromisoformat(log['timestamp']) > week_ago and
-                            'details' in log and 'query' in log['details']):
-                            searches[log['details']['query']] += 1
-                    
-                    search_analytics = [
-                        {'term': term, 'count': count}
-                        for term, count in searches.most_common(5)
-                    ]
-            except Exception as e:
-                print(f"Error processing search analytics: {e}")
+            search_analytics = [
+                {'term': term, 'count': count}
+                for term, count in search_terms.most_common(5)
+            ]
 
             # Calculate engagement metrics
             try:
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
-                    now = datetime.now()
-                    day_ago = now - timedelta(days=1)
+                # Calculate average session duration in minutes
+                avg_session_duration = (total_duration.total_seconds() / session_count / 60) if session_count > 0 else 0
                     
-                    # Calculate active sessions and session duration
-                    sessions = {}
-                    active_sessions = 0
-                    total_duration = timedelta()
-                    session_count = 0
+                # Calculate page views
+                page_views = (activity_counters.count('minute', day_ago, now)
+                              - activity_counters.count('minute', day_ago, now, action=('login', 'logout')))
                     
-                    for log in logs:
-                        if log['action'] in ['login', 'logout'] and 'user' in log:
-                            user = log['user']
-                            log_time = datetime.fromisoformat(log['timestamp'])
-                            
-                            if log['action'] == 'login':
-                                sessions[user] = {'start': log_time}
-                                if log_time > day_ago:
-                                    active_sessions += 1
-                            elif log['action'] == 'logout' and user in sessions:
-                                if 'start' in sessions[user]:
-                                    duration = log_time - sessions[user]['start']
-                                    total_duration += duration
-                                    session_count += 1
-                                    del sessions[user]
-
-                    # Calculate average session duration in minutes
-                    avg_session_duration = (total_duration.total_seconds() / session_count / 60) if session_count > 0 else 0
-                    
-                    # Calculate page views
-                    page_views = len([log for log in logs if 
-                                    datetime.fromisoformat(log['timestamp']) > day_ago and
-                                    log['action'] not in ['login', 'logout']])
-                    
-                    # Calculate activity heatmap
-                    heatmap_data = [[0 for _ in range(24)] for _ in range(7)]  # 7 days x 24 hours
-                    week_ago = now - timedelta(days=7)
+                # Calculate activity heatmap
+                heatmap_data = [[0 for _ in range(24)] for _ in range(7)]  # 7 days x 24 hours
                     
-                    for log in logs:
-                        log_time = datetime.fromisoformat(log['timestamp'])
-                        if log_time > week_ago:
-                            day_index = log_time.weekday()
-                            hour_index = log_time.hour
-                            heatmap_data[day_index][hour_index] += 1
+                for hour, count in activity_counters.buckets('hour', week_ago, now):
+                    heatmap_data[hour.weekday()][hour.hour] += count
             except Exception as e:
                 print(f"Error calculating engagement metrics: {e}")
                 active_sessions = 0
@@ -2154,8 +2117,7 @@ def create_app():
 
         # Get plants for the assign dropdown
         try:
-            with open('static/data/plants.json', 'r') as f:
-                plants = json.load(f)
+            plants = plant_store.all()
         except:
             plants = []
 
@@ -2207,14 +2169,13 @@ def create_app():
             if os.path.exists(file_path):
                 # Check if image is being used by any plant
                 try:
-                    with open('static/data/plants.json', 'r') as f:
-                        plants = json.load(f)
-                        for plant in plants:
-                            if filename in plant.get('image_url', ''):
-                                return jsonify({
-                                    'success': False, 
-                                    'error': 'Image is currently assigned to a plant'
-                                }), 400
+                    plants = plant_store.all()
+                    for plant in plants:
+                        if filename in plant.get('image_url', ''):
+                            return jsonify({
+                                'success': False, 
+                                'error': 'Image is currently assigned to a plant'
+                            }), 400
                 except:
                     pass  # If we can't check plants, proceed with deletion
 
@@ -2247,26 +2208,14 @@ def create_app():
                 flash('Missing image name or plant ID', 'error')
                 return redirect(url_for('admin_images'))
 
-            # Load plants data
-            with open('static/data/plants.json', 'r') as f:
-                plants = json.load(f)
-
-            # Find and update the plant
-            for plant in plants:
-                if plant['id'] == plant_id:
-                    # Update image URL
-                    plant['image_url'] = url_for('static', 
-                                               filename=f'images/uploads/{image_name}',
-                                               _external=True)
-                    break
-            else:
+            # Update the plant's image URL
+            image_url = url_for('static', 
+                                filename=f'images/uploads/{image_name}',
+                                _external=True)
+            if plant_store.update(plant_id, {'image_url': image_url}) is None:
                 flash('Plant not found', 'error')
                 return redirect(url_for('admin_images'))
 
-            # Save updated plants data
-            with open('static/data/plants.json', 'w') as f:
-                json.dump(plants, f, indent=2)
-
             flash('Image successfully assigned to plant', 'success')
             return redirect(url_for('admin_images'))
 
@@ -2281,8 +2230,7 @@ def create_app():
             return jsonify({'error': 'Access denied'}), 403
         
         try:
-            with open('static/data/plants.json', 'r') as f:
-                plants = json.load(f)
+            plants = plant_store.all()
             
             # Create CSV content
             si = io.StringIO()
@@ -2316,8 +2264,7 @@ def create_app():
         
         try:
             updated_data = request.json
-            with open('static/data/plants.json', 'w') as f:
-                json.dump(updated_data, f, indent=2)
+            plant_store.save(updated_data)
             
             log_action('update_plants_data', session.get('username'))
             return jsonify({'success': True})
@@ -2355,22 +2302,15 @@ def create_app():
             plants_last_month = 0
             
             try:
-                with open('static/data/plants.json', 'r') as f:
-                    plants = json.load(f)
-                total_plants = len(plants)
+                total_plants = plant_store.count()
                 
                 # Calculate plants growth
                 today = datetime.now()
                 this_month = today.replace(day=1)
                 last_month = (this_month - timedelta(days=1)).replace(day=1)
                 
-                for plant in plants:
-                    if 'date_added' in plant:
-                        date_added = datetime.strptime(plant['date_added'], '%Y-%m-%d')
-                        if date_added >= this_month:
-                            plants_this_month += 1
-                        elif date_added >= last_month:
-                            plants_last_month += 1
+                plants_this_month = plant_store.count_added(this_month)
+                plants_last_month = plant_store.count_added(last_month, this_month)
             except Exception as e:
                 print(f"Error processing plants data: {e}")
             
@@ -2397,40 +2337,30 @@ def create_app():
             # Calculate active users (users who logged in within last 24 hours)
             active_users = 0
             try:
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
-                    yesterday = (datetime.now() - timedelta(days=1)).isoformat()
-                    active_users = len(set(
-                        log['user'] for log in logs
-                        if log['action'] == 'login' and log['timestamp'] > yesterday
-                    ))
+                yesterday = datetime.now() - timedelta(days=1)
+                active_users = len(set(
+                    log['user'] for log in log_store.scan(yesterday, action='login')
+                ))
             except Exception as e:
                 print(f"Error processing logs for active users: {e}")
 
             # Get recent searches from logs
             recent_searches = 0
             try:
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
-                    week_ago = (datetime.now() - timedelta(days=7)).isoformat()
-                    recent_searches = len([
-                        log for log in logs
-                        if log['action'] == 'search' and log['timestamp'] > week_ago
-                    ])
+                week_ago = datetime.now() - timedelta(days=7)
+                recent_searches = activity_counters.count('hour', week_ago, action='search')
             except Exception as e:
                 print(f"Error processing logs for recent searches: {e}")
 
             # Calculate system health (simple metric based on recent errors)
             system_health = 100
             try:
-                with open(LOG_FILE, 'r') as f:
-                    logs = json.load(f)
-                    day_ago = (datetime.now() - timedelta(days=1)).isoformat()
-                    recent_logs = [log for log in logs if log['timestamp'] > day_ago]
-                    error_logs = [log for log in recent_logs if 'error' in log['action'].lower()]
-                    if recent_logs:
-                        error_percentage = (len(error_logs) / len(recent_logs)) * 100
-                        system_health = max(0, 100 - error_percentage)
+                day_ago = datetime.now() - timedelta(days=1)
+                recent_logs = activity_counters.count('minute', day_ago)
+                error_logs = activity_counters.count('minute', day_ago, errors=True)
+                if recent_logs:
+                    error_percentage = (error_logs / recent_logs) * 100
+                    system_health = max(0, 100 - error_percentage)
             except Exception as e:
                 print(f"Error calculating system health: {e}")
 
@@ -2522,13 +2452,11 @@ def create_app():
             return redirect(url_for('index'))
         
         logs = []
-        if os.path.exists(LOG_FILE):
-            try:
-                with open(LOG_FILE, 'r', encoding='utf-8') as f:
-                    logs = json.load(f)
-            except Exception as e:
-                print(f"Error loading logs: {e}")
-                flash('Error loading logs.', 'error')
+        try:
+            logs = load_logs()
+        except Exception as e:
+            print(f"Error loading logs: {e}")
+            flash('Error loading logs.', 'error')
         
         return render_template('admin/logs.html', logs=logs)
 
@@ -2558,23 +2486,22 @@ def create_app():
 
             # Calculate plant growth
             try:
-                with open('static/data/plants.json', 'r') as f:
-                    plants = json.load(f)
-                    for plant in plants:
-                        if 'date_added' in plant:
-                            date_added = datetime.strptime(plant['date_added'], '%Y-%m-%d')
-                            
-                            # Monthly growth
-                            if date_added >= current_month_start:
-                                monthly_growth['plants']['current'] += 1
-                            elif previous_month_start <= date_added < current_month_start:
-                                monthly_growth['plants']['previous'] += 1
-
-                            # Yearly growth
-                            if date_added >= current_year_start:
-                                yearly_growth['plants']['current'] += 1
-                            elif previous_year_start <= date_added < current_year_start:
-                                yearly_growth['plants']['previous'] += 1
+                plants = plant_store.all()
+                for plant in plants:
+                    if 'date_added' in plant:
+                        date_added = datetime.strptime(plant['date_added'], '%Y-%m-%d')
+                        
+                        # Monthly growth
+                        if date_added >= current_month_start:
+                            monthly_growth['plants']['current'] += 1
+                        elif previous_month_start <= date_added < current_month_start:
+                            monthly_growth['plants']['previous'] += 1
+
+                        # Yearly growth
+                        if date_added >= current_year_start:
+                            yearly_growth['plants']['current'] += 1
+                        elif previous_year_start <= date_added < current_year_start:
+                            yearly_growth['plants']['previous'] += 1
             except Exception as e:
                 print(f"Error calculating plant growth: {e}")
 
@@ -2632,7 +2559,7 @@ def create_app():
     @app.route('/api/autocomplete')
     def autocomplete():
         query = request.args.get('q', '').lower()
-        results = [p['common_name'] for p in PLANTS_DATA if query in p['common_name'].lower()][:10]
+        results = [common_name for kind, common_name, plant_id in plant_store.suggest(query, ('common_name',), 10)]
         return jsonify({'suggestions': results})
 
     @app.route('/api/export-plants', methods=['POST'])
@@ -0,0 +1,64 @@
+import os
+import mmap
+import struct
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: counters stay per-process
+    fcntl = None
+
+
+class DataVersion:
+    """Generation counters shared by all worker processes.
+
+    Every name gets an 8-byte slot in a small memory-mapped file. Whoever
+    changes the plants, settings or logs bumps the matching slot; readers
+    compare the slot with the value they saw last time, which is a single
+    memory read, and only refresh their in-memory copy when it moved.
+    """
+
+    NAMES = ('plants', 'settings', 'logs')
+    _SLOT = struct.Struct('<Q')
+
+    def __init__(self, path, names=NAMES):
+        self.path = path
+        self.names = tuple(names)
+        self._offsets = {name: i * self._SLOT.size for i, name in enumerate(self.names)}
+        self._lock = threading.Lock()
+        self._local = dict.fromkeys(self.names, 0)
+        self._fd = None
+        self._map = None
+        size = self._SLOT.size * len(self.names)
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+            self._fd = fd
+        except (OSError, ValueError) as e:
+            print(f"Shared data version unavailable, using per-process counters: {e}")
+
+    def get(self, name):
+        """Return the current generation for name."""
+        if self._map is None:
+            return self._local[name]
+        return self._SLOT.unpack_from(self._map, self._offsets[name])[0]
+
+    def bump(self, name):
+        """Record that the data behind name changed; returns the new generation."""
+        with self._lock:
+            if self._map is None:
+                self._local[name] += 1
+                return self._local[name]
+            # lockf (not flock) so workers forked with an inherited fd still
+            # exclude each other
+            if fcntl is not None:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                value = self.get(name) + 1
+                self._SLOT.pack_into(self._map, self._offsets[name], value)
+            finally:
+                if fcntl is not None:
+                    fcntl.lockf(self._fd, fcntl.LOCK_UN)
+            return value
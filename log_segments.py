@@ -0,0 +1,234 @@
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process exclude each other
+    fcntl = None
+
+
+class LogSegments:
+    """Append-only activity log kept as newline-delimited JSON segments.
+
+    Entries go to <directory>/activity-YYYYMMDD-NNN.jsonl, one O_APPEND
+    write per batch, so worker processes can share a segment without
+    overwriting each other. A new segment starts every day and whenever
+    the current one reaches max_bytes; closed segments are gzip-compressed
+    and segments older than retention_days are deleted. Appends, rotation
+    and compression take an exclusive lock on <directory>/.lock, so nobody
+    writes into a segment while it is being compressed.
+
+    read() picks up from a position returned by the previous read, so
+    readers only parse what was appended since; compressed segments are
+    never read twice. read_segment() reads byte ranges of one segment
+    again, at offsets an earlier read() reported.
+    """
+
+    SEGMENT = re.compile(r'^activity-(\d{8})-(\d{3})\.jsonl(\.gz)?$')
+
+    def __init__(self, directory, max_bytes=8 * 1024 * 1024, retention_days=180):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._lock_fd = None
+        self._current = None
+        self._fd = None
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            if self._lock_fd is None:
+                self._lock_fd = os.open(os.path.join(self.directory, '.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+            # lockf (not flock) so forked workers sharing the fd still exclude each other
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._lock_fd, fcntl.LOCK_UN)
+
+    def _segments(self):
+        """Sorted (day, number, file name) of the segments on disk."""
+        segments = []
+        for name in os.listdir(self.directory):
+            match = self.SEGMENT.match(name)
+            if match:
+                segments.append((match.group(1), int(match.group(2)), name))
+        segments.sort()
+        return segments
+
+    def _segment_path(self):
+        # Keep writing to the current segment while it is today's, still
+        # there (not compressed by another worker) and not full
+        today = time.strftime('%Y%m%d')
+        path = self._current
+        if path is not None and os.path.basename(path)[9:17] == today:
+            try:
+                if os.path.getsize(path) < self.max_bytes:
+                    return path
+            except OSError:
+                pass
+        return self._rotate(today)
+
+    def _rotate(self, today):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        segments = self._segments()
+        number = 0
+        path = None
+        todays = [(n, name) for day, n, name in segments if day == today]
+        if todays:
+            number, name = todays[-1]
+            candidate = os.path.join(self.directory, name)
+            if name.endswith('.jsonl') and os.path.getsize(candidate) < self.max_bytes:
+                path = candidate
+            else:
+                number += 1
+        if path is None:
+            path = os.path.join(self.directory, f'activity-{today}-{number:03d}.jsonl')
+        self._current = path
+
+        cutoff = time.strftime('%Y%m%d', time.localtime(time.time() - self.retention_days * 86400))
+        for day, n, name in segments:
+            other = os.path.join(self.directory, name)
+            if day < cutoff:
+                os.remove(other)
+            elif name.endswith('.jsonl') and other != path:
+                self._compress(other)
+        return path
+
+    def _compress(self, path):
+        with open(path, 'rb') as src, gzip.open(path + '.gz.tmp', 'wb') as dst:
+            while True:
+                chunk = src.read(1 << 20)
+                if not chunk:
+                    break
+                dst.write(chunk)
+        os.replace(path + '.gz.tmp', path + '.gz')
+        os.remove(path)
+
+    def append(self, entries):
+        """Append entries (JSON-serialisable dicts) to the current segment."""
+        data = ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries).encode('utf-8')
+        if not data:
+            return
+        with self._locked():
+            self._write(data)
+
+    def _write(self, data):
+        path = self._segment_path()
+        if self._fd is None:
+            self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view):]
+
+    def import_json(self, path):
+        """Move the entries of an old single-file JSON array log into the segments."""
+        with self._locked():
+            if not os.path.exists(path):
+                return 0
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+            except ValueError as e:
+                print(f"Skipping unreadable log file {path}: {e}")
+                entries = []
+            self._write(''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries).encode('utf-8'))
+            os.replace(path, path + '.imported')
+            return len(entries)
+
+    def read(self, position=None):
+        """Entries appended after position, as (chunks, new position, rewound).
+
+        chunks holds (key, entries, end) for each segment with new entries:
+        its (day, number) key, (byte offset, entry) for each new line and
+        the offset read up to.
+        position is what the previous call returned (None reads everything
+        kept). rewound is True when segments covered by position have been
+        deleted since, in which case the caller should start over.
+        """
+        position = dict(position or {})
+        files = []
+        with self._locked():
+            segments = self._segments()
+            # Open files under the lock: a segment compressed and removed
+            # afterwards can still be read through its handle
+            for day, n, name in segments:
+                if position.get((day, n)) is True:
+                    continue
+                path = os.path.join(self.directory, name)
+                compressed = name.endswith('.gz')
+                files.append(((day, n), compressed, gzip.open(path, 'rb') if compressed else open(path, 'rb')))
+        chunks = []
+        for key, compressed, f in files:
+            with f:
+                offset = position.get(key, 0)
+                if offset:
+                    f.seek(offset)
+                data = f.read()
+                if compressed:
+                    # Closed for good: nothing more to read from it
+                    position[key] = True
+                else:
+                    # Leave a partly written last line for the next read
+                    data = data[:data.rfind(b'\n') + 1]
+                    position[key] = offset + len(data)
+                if data:
+                    chunks.append((key, _parse(data, offset), offset + len(data)))
+        live = {(day, n) for day, n, name in segments}
+        rewound = False
+        for key in list(position):
+            if key not in live:
+                del position[key]
+                rewound = True
+        return chunks, position, rewound
+
+    def read_segment(self, key, ranges):
+        """(byte offset, entry) for the lines in ranges of the segment with (day, number) key.
+
+        ranges are (start, end) byte offsets at line boundaries, in order,
+        as read() reported them; they still hold once the segment has been
+        compressed. Returns [] if the segment has been deleted.
+        """
+        day, number = key
+        path = os.path.join(self.directory, f'activity-{day}-{number:03d}.jsonl')
+        with self._locked():
+            try:
+                f = open(path, 'rb')
+            except FileNotFoundError:
+                try:
+                    f = gzip.open(path + '.gz', 'rb')
+                except FileNotFoundError:
+                    return []
+        entries = []
+        with f:
+            for start, end in ranges:
+                f.seek(start)
+                entries.extend(_parse(f.read(end - start), start))
+        return entries
+
+
+_decoder = json.JSONDecoder()
+
+
+def _parse(data, offset=0):
+    entries = []
+    for line in data.splitlines(True):
+        if line.strip():
+            try:
+                entries.append((offset, _decoder.decode(line.decode('utf-8'))))
+            except ValueError:
+                pass
+        offset += len(line)
+    return entries
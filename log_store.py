@@ -0,0 +1,324 @@
+import bisect
+import heapq
+import threading
+from datetime import datetime
+from operator import itemgetter
+
+
+class _Series:
+    """Entries kept in timestamp order, with their epoch times and log positions alongside."""
+
+    def __init__(self):
+        self.times = []
+        self.origins = []
+        self.entries = []
+
+    def add(self, moment, origin, entry):
+        if not self.times or moment >= self.times[-1]:
+            self.times.append(moment)
+            self.origins.append(origin)
+            self.entries.append(entry)
+        else:
+            # Batches from different workers can land slightly out of order
+            i = bisect.bisect_right(self.times, moment)
+            self.times.insert(i, moment)
+            self.origins.insert(i, origin)
+            self.entries.insert(i, entry)
+
+    def bounds(self, start, end):
+        lo = 0 if start is None else bisect.bisect_right(self.times, start)
+        hi = len(self.times) if end is None else bisect.bisect_right(self.times, end)
+        return lo, max(lo, hi)
+
+
+class _Segment:
+    """What the store keeps of one log segment: its time spans and counts."""
+
+    # Entries per block of the sparse index
+    BLOCK = 512
+
+    def __init__(self, key):
+        self.key = key
+        self.end = 0
+        self.first = float('inf')
+        self.last = float('-inf')
+        # [byte offset, entries, earliest, latest time] of each block of lines
+        self.blocks = []
+        # Entries that are not errors: in total, per action and per user
+        self.count = 0
+        self.actions = {}
+        self.users = {}
+
+    def index(self, offset, moment):
+        block = self.blocks[-1] if self.blocks else None
+        if block is None or block[1] >= self.BLOCK:
+            block = [offset, 0, moment, moment]
+            self.blocks.append(block)
+        block[1] += 1
+        block[2] = min(block[2], moment)
+        block[3] = max(block[3], moment)
+        self.first = min(self.first, moment)
+        self.last = max(self.last, moment)
+
+    def ranges(self, start, end):
+        """(start, end) byte offsets of the blocks that can hold entries in (start, end]."""
+        found = []
+        for i, (offset, count, first, last) in enumerate(self.blocks):
+            if (start is not None and last <= start) or (end is not None and first > end):
+                continue
+            stop = self.blocks[i + 1][0] if i + 1 < len(self.blocks) else self.end
+            if found and found[-1][1] == offset:
+                found[-1] = (found[-1][0], stop)
+            else:
+                found.append((offset, stop))
+        return found
+
+    def overlaps(self, start, end):
+        return (start is None or self.last > start) and (end is None or self.first <= end)
+
+    def within(self, start, end):
+        return (start is None or self.first > start) and (end is None or self.last <= end)
+
+    def has(self, actions, user):
+        return ((actions is None or any(a in self.actions for a in actions))
+                and (user is None or user in self.users))
+
+
+class LogStore:
+    """Activity log entries indexed by time, for range scans and counts.
+
+    The store does not keep the log in memory. For each segment it keeps
+    a sparse index: the byte offset and span of entry times of every
+    block of _Segment.BLOCK lines, and how many entries the segment holds
+    in total, per action and per user. Counts over whole segments come
+    from those; a range scan only reads the blocks whose span overlaps
+    the range, in segments that have the action or user asked for.
+    Errors (actions containing "error") are few, so they are kept in
+    memory in timestamp order, and "errors in the last 24 hours" is two
+    binary searches.
+
+    Ranges are (start, end]: after start, up to and including end, with
+    None for unbounded. Every query first indexes entries appended since
+    the last one, when the shared logs generation has moved.
+
+    Clearing or acknowledging error logs appends a control entry: errors
+    logged up to its time are dropped, or marked acknowledged.
+    """
+
+    def __init__(self, segments, data_version=None):
+        self.segments = segments
+        self.data_version = data_version
+        self._lock = threading.RLock()
+        self._generation = None
+        self._reset()
+
+    def _reset(self):
+        self._position = None
+        self._segments = {}
+        self._errors = _Series()
+        self._cleared = float('-inf')
+        self._acknowledged = float('-inf')
+
+    def refresh(self):
+        """Index entries appended since the last refresh."""
+        generation = self.data_version.get('logs') if self.data_version is not None else None
+        with self._lock:
+            if generation is not None and generation == self._generation:
+                return
+            chunks, position, rewound = self.segments.read(self._position)
+            if rewound:
+                # Old segments were deleted: rebuild from what is kept
+                self._reset()
+                chunks, position, rewound = self.segments.read()
+            self._position = position
+            self._generation = generation
+            for key, entries, end in chunks:
+                segment = self._segments.get(key)
+                if segment is None:
+                    segment = self._segments[key] = _Segment(key)
+                for offset, entry in entries:
+                    self._add(segment, offset, entry)
+                segment.end = end
+
+    def _add(self, segment, offset, entry):
+        moment = _epoch(entry.get('timestamp'))
+        control = entry.get('control')
+        if control == 'clear_errors':
+            self._cleared = max(self._cleared, moment)
+            self._rebuild()
+            return
+        if control == 'acknowledge_errors':
+            self._acknowledged = max(self._acknowledged, moment)
+            self._rebuild()
+            return
+        if control is not None:
+            return
+        segment.index(offset, moment)
+        if _error(entry):
+            self._add_error(moment, (segment.key, offset), entry)
+            return
+        segment.count += 1
+        action, user = entry.get('action'), entry.get('user')
+        segment.actions[action] = segment.actions.get(action, 0) + 1
+        segment.users[user] = segment.users.get(user, 0) + 1
+
+    def _add_error(self, moment, origin, entry):
+        if moment <= self._cleared:
+            return
+        if moment <= self._acknowledged and not entry.get('acknowledged'):
+            entry = dict(entry, acknowledged=True)
+        self._errors.add(moment, origin, entry)
+
+    def _rebuild(self):
+        # Re-add the errors so a new clear/acknowledge applies to earlier ones
+        kept = list(zip(self._errors.times, self._errors.origins, self._errors.entries))
+        self._errors = _Series()
+        for moment, origin, entry in kept:
+            self._add_error(moment, origin, entry)
+
+    def _read(self, spans, start, end, actions=None, user=None):
+        """(epoch seconds, position, entry) for the entries that are not errors in the given spans.
+
+        spans are (first, last, key, byte ranges) of segments, sorted by
+        first. Segments whose times overlap are read together and sorted,
+        so only one run of them is in memory at a time. position is
+        (segment key, byte offset): entries logged at the same time stay in
+        log order.
+        """
+        i = 0
+        while i < len(spans):
+            last = spans[i][1]
+            j = i + 1
+            while j < len(spans) and spans[j][0] <= last:
+                last = max(last, spans[j][1])
+                j += 1
+            found = []
+            for first, latest, key, ranges in spans[i:j]:
+                for offset, entry in self.segments.read_segment(key, ranges):
+                    if entry.get('control') is not None or _error(entry):
+                        continue
+                    moment = _epoch(entry.get('timestamp'))
+                    if (start is None or moment > start) and (end is None or moment <= end) \
+                            and _matches(entry, actions, user):
+                        found.append((moment, (key, offset), entry))
+            found.sort(key=itemgetter(0, 1))
+            yield from found
+            i = j
+
+    def _spans(self, segments, start, end):
+        spans = []
+        for s in segments:
+            ranges = s.ranges(start, end)
+            if ranges:
+                spans.append((s.first, s.last, s.key, ranges))
+        spans.sort(key=itemgetter(0, 1, 2))
+        return spans
+
+    def _timeline(self, start, end, actions=None, user=None, errors=False):
+        start, end = _bound(start), _bound(end)
+        self.refresh()
+        with self._lock:
+            lo, hi = self._errors.bounds(start, end)
+            found = [item for item in zip(self._errors.times[lo:hi], self._errors.origins[lo:hi],
+                                          self._errors.entries[lo:hi])
+                     if _matches(item[2], actions, user)]
+            if errors:
+                spans = []
+            else:
+                spans = self._spans((s for s in self._segments.values()
+                                     if s.overlaps(start, end) and s.has(actions, user)), start, end)
+        if spans:
+            found = heapq.merge(self._read(spans, start, end, actions, user), found, key=itemgetter(0, 1))
+        for moment, origin, entry in found:
+            yield moment, entry
+
+    def scan(self, start=None, end=None, action=None, user=None, errors=False):
+        """Entries in (start, end], oldest first, optionally of some action(s), user or errors only.
+
+        start and end are datetimes; action is one action or several.
+        """
+        return [entry for moment, entry in self._timeline(start, end, _actions(action), user, errors)]
+
+    def timeline(self, start=None, end=None):
+        """(epoch seconds, entry) for every entry in (start, end], oldest first.
+
+        A generator, for single-pass consumers that bucket or window
+        entries themselves without parsing each timestamp again.
+        """
+        return self._timeline(start, end)
+
+    def count(self, start=None, end=None, action=None, user=None, errors=False):
+        """Number of entries scan() would return."""
+        actions = _actions(action)
+        start, end = _bound(start), _bound(end)
+        self.refresh()
+        with self._lock:
+            lo, hi = self._errors.bounds(start, end)
+            total = sum(1 for entry in self._errors.entries[lo:hi] if _matches(entry, actions, user))
+            if errors:
+                return total
+            partial = []
+            for s in self._segments.values():
+                if not s.overlaps(start, end) or not s.has(actions, user):
+                    continue
+                if not s.within(start, end) or (actions is not None and user is not None):
+                    partial.append(s)
+                elif actions is not None:
+                    total += sum(s.actions.get(a, 0) for a in actions)
+                elif user is not None:
+                    total += s.users[user]
+                else:
+                    total += s.count
+            spans = self._spans(partial, start, end)
+        return total + sum(1 for item in self._read(spans, start, end, actions, user))
+
+    def users(self, start=None, end=None):
+        """Users (None included) with at least one entry in (start, end]."""
+        start, end = _bound(start), _bound(end)
+        self.refresh()
+        with self._lock:
+            lo, hi = self._errors.bounds(start, end)
+            found = {entry.get('user') for entry in self._errors.entries[lo:hi]}
+            partial = []
+            for s in self._segments.values():
+                if not s.overlaps(start, end):
+                    continue
+                if s.within(start, end):
+                    found.update(s.users)
+                else:
+                    partial.append(s)
+            partial = [s for s in partial if not found.issuperset(s.users)]
+            spans = self._spans(partial, start, end)
+        found.update(entry.get('user') for moment, origin, entry in self._read(spans, start, end))
+        return found
+
+
+def _error(entry):
+    return 'error' in str(entry.get('action', '')).lower()
+
+
+def _actions(action):
+    if action is None:
+        return None
+    return (action,) if isinstance(action, str) else tuple(action)
+
+
+def _matches(entry, actions, user):
+    return ((actions is None or entry.get('action') in actions)
+            and (user is None or entry.get('user') == user))
+
+
+def _epoch(timestamp):
+    # Entries without a usable timestamp sort first and fall outside every bounded range
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return float('-inf')
+
+
+def _bound(moment):
+    if moment is None:
+        return None
+    if isinstance(moment, datetime):
+        return moment.timestamp()
+    return float(moment)
@@ -0,0 +1,104 @@
+import atexit
+import os
+import queue
+import threading
+import time
+
+# Queue markers: write what has been taken so far / stop the writer thread
+_FLUSH = object()
+_STOP = object()
+
+
+class LogWriter:
+    """Batched background writer for the activity log.
+
+    Callers of append() only put the entry on a queue. A daemon thread
+    takes entries off it and hands them to the log (a LogSegments) once
+    per batch: when batch_size entries are waiting, or flush_interval
+    seconds after the first entry of the batch arrived. on_flush runs
+    after every write. With background=False (e.g. serverless, where
+    threads stop between requests) append() writes straight away.
+    """
+
+    def __init__(self, log, batch_size=100, flush_interval=1.0, on_flush=None, background=True):
+        self.log = log
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.background = background
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        if background:
+            atexit.register(self.close)
+
+    def _ensure_thread(self):
+        # Started on first use, again in a process forked after that, and
+        # again if it died (what it had not taken stays on the queue)
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid() and thread.is_alive():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = None
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+                self._thread.start()
+
+    def append(self, entry):
+        """Queue one log entry for writing."""
+        if not self.background:
+            self._write([entry])
+            return
+        self._ensure_thread()
+        self._queue.put(entry)
+
+    def flush(self):
+        """Block until every entry appended so far is in the file."""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._ensure_thread()
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self):
+        """Write what is queued and stop the writer thread."""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self):
+        q = self._queue
+        stop = False
+        while not stop:
+            batch = [q.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] not in (_FLUSH, _STOP) and len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(q.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            stop = batch[-1] is _STOP
+            try:
+                self._write([entry for entry in batch if entry is not _FLUSH and entry is not _STOP])
+            finally:
+                for _ in batch:
+                    q.task_done()
+
+    def _write(self, entries):
+        if not entries:
+            return
+        try:
+            self.log.append(entries)
+            if self.on_flush is not None:
+                self.on_flush()
+        except Exception as e:
+            print(f"Error writing logs: {e}")
@@ -0,0 +1,763 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import IntegrityError
+import query_language
+from search_index import SearchIndex, _decode_cursor, _encode_cursor
+from spelling import WORD
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+
+class PlantStore:
+    """Keeps the parsed plants dataset in memory for every route.
+
+    The dataset is a base snapshot (plants.json) plus an append-only journal of
+    upsert/delete operations next to it. Edits only append one line to the
+    journal; readers apply new journal lines on top of the snapshot and
+    compact() folds the journal back into the snapshot once it grows.
+
+    Both files are only re-read when their inode, size or modification time
+    changes, so edits made by another process (seed_data.py, a different
+    gunicorn worker, a manual edit) are still picked up. When a shared
+    DataVersion is given, writers bump its 'plants' generation and readers
+    skip even the stat() calls while it is unchanged, re-checking the files
+    at most once per STAT_INTERVAL for edits made outside the app.
+    """
+
+    STAT_INTERVAL = 1.0
+
+    def __init__(self, path, journal_path=None, compact_after=1000, data_version=None, safety_keywords=None,
+                 aliases=None):
+        self.path = path
+        self.journal_path = journal_path or os.path.splitext(path)[0] + '.journal'
+        self.compact_after = compact_after
+        self.data_version = data_version
+        self._generation = None
+        self._next_stat_check = 0
+        self._lock = threading.RLock()
+        self._records = {}
+        self._plants = []
+        self._loaded = False
+        self._base_signature = None
+        self._journal_signature = None
+        self._journal_offset = 0
+        self._journal_ops = 0
+        self.index = SearchIndex(safety_keywords, aliases)
+
+    @staticmethod
+    def _stat_signature(path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    @contextmanager
+    def _journal_lock(self, exclusive=False):
+        """Hold a shared (read) or exclusive (write) lock on the journal file."""
+        if fcntl is None:
+            yield None
+            return
+        flags = os.O_RDWR | os.O_CREAT if exclusive else os.O_RDONLY
+        try:
+            fd = os.open(self.journal_path, flags, 0o644)
+        except OSError:
+            if exclusive:
+                raise
+            # No journal yet (or a read-only filesystem): nothing to lock
+            yield None
+            return
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield fd
+        finally:
+            os.close(fd)
+
+    def refresh(self):
+        """Pick up changes made to the snapshot or journal since the last load"""
+        generation = None
+        if self.data_version is not None:
+            generation = self.data_version.get('plants')
+            if (self._loaded and generation == self._generation
+                    and time.monotonic() < self._next_stat_check):
+                return
+        if not (self._loaded
+                and self._stat_signature(self.path) == self._base_signature
+                and self._stat_signature(self.journal_path) == self._journal_signature):
+            with self._lock:
+                with self._journal_lock():
+                    self._sync()
+        self._generation = generation
+        self._next_stat_check = time.monotonic() + self.STAT_INTERVAL
+
+    def _bump_generation(self):
+        # Called while holding the exclusive journal lock, so every bump we
+        # see was made after data we have already synced
+        if self.data_version is not None:
+            self._generation = self.data_version.bump('plants')
+
+    def _sync(self):
+        # Caller holds self._lock and a lock on the journal file
+        base_signature = self._stat_signature(self.path)
+        if not self._loaded or base_signature != self._base_signature:
+            self._load_base()
+            self._base_signature = base_signature
+            self._journal_offset = 0
+            self._journal_ops = 0
+        journal_signature = self._stat_signature(self.journal_path)
+        journal_size = journal_signature[1] if journal_signature else 0
+        if journal_size < self._journal_offset:
+            # The journal was truncated by a compaction we have not seen yet
+            self._load_base()
+            self._base_signature = self._stat_signature(self.path)
+            self._journal_offset = 0
+            self._journal_ops = 0
+        if journal_size > self._journal_offset:
+            self._replay_journal()
+        self._journal_signature = journal_signature
+        self._loaded = True
+
+    def _load_base(self):
+        plants = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                plants = json.load(f)
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError as e:
+            print(f"Error loading plants: {e}")
+        self._index(plants)
+
+    def _index(self, plants):
+        records = {}
+        for i, plant in enumerate(plants):
+            plant_id = plant.get('id')
+            if plant_id is None or plant_id in records:
+                # Keep records without a unique id in the list; the first
+                # record wins id lookups, like the old next(...) scans.
+                plant_id = ('#', i)
+            records[plant_id] = plant
+        self._records = records
+        self._plants = None
+        self.index.reset(records)
+
+    def _replay_journal(self):
+        try:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(self._journal_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        # Ignore a trailing partial line left by a crash mid-write
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Skipping bad plants journal entry: {e}")
+                continue
+            self._journal_ops += 1
+        self._journal_offset += end
+
+    def _apply(self, op):
+        if op['op'] == 'upsert':
+            plant = op['plant']
+            self._records[plant['id']] = plant
+            self.index.upsert(plant['id'], plant)
+        elif op['op'] == 'delete':
+            self._records.pop(op['id'], None)
+            self.index.remove(op['id'])
+        self._plants = None
+
+    def _append(self, ops, create=False):
+        """Append operations to the journal and apply them in memory.
+
+        With create, the upserted plants must be new: one without an id gets
+        the first free number from the plant count + 1 up, and nothing is
+        written (returns False) if an id is taken. The check runs under the
+        exclusive journal lock, so other workers cannot claim the id first.
+
+        An 'update' op ({'id', 'changes'}) is merged into the current record
+        under the same lock, after catching up, so changes other workers made
+        to the plant are kept; it is journaled as an upsert. Nothing is
+        written (returns False) if the plant does not exist.
+        """
+        with self._lock:
+            fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                # Catch up with other writers so our offset stays correct
+                self._sync()
+                if create and not self._claim_ids([op['plant'] for op in ops]):
+                    return False
+                for i, op in enumerate(ops):
+                    if op['op'] == 'update':
+                        current = self._records.get(op['id'])
+                        if current is None:
+                            return False
+                        ops[i] = {'op': 'upsert', 'plant': dict(current, **op['changes'])}
+                data = ''.join(json.dumps(op, separators=(',', ':')) + '\n' for op in ops).encode('utf-8')
+                written = 0
+                while written < len(data):
+                    written += os.write(fd, data[written:])
+                os.fsync(fd)
+                for op in ops:
+                    self._apply(op)
+                self._journal_offset += len(data)
+                self._journal_ops += len(ops)
+                self._journal_signature = self._stat_signature(self.journal_path)
+                self._bump_generation()
+            finally:
+                os.close(fd)
+            if self._journal_ops >= self.compact_after:
+                self.compact()
+            return True
+
+    def _claim_ids(self, plants):
+        # Caller holds the exclusive journal lock and has synced
+        taken = set()
+        for plant in plants:
+            if plant.get('id') is None:
+                number = len(self._records) + 1
+                while str(number) in self._records or str(number) in taken:
+                    number += 1
+                plant['id'] = str(number)
+            elif plant['id'] in self._records or plant['id'] in taken:
+                return False
+            taken.add(plant['id'])
+        return True
+
+    def _write_base(self, plants):
+        # Write to a temporary file and rename so readers never see a
+        # half-written snapshot
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(plants, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _rewrite(self, plants=None):
+        """Write a new snapshot (current data by default) and empty the journal."""
+        with self._lock:
+            with self._journal_lock(exclusive=True) as fd:
+                self._sync()
+                replace = plants is not None
+                if not replace:
+                    if self._journal_offset == 0:
+                        return
+                    plants = list(self._records.values())
+                self._write_base(plants)
+                if replace:
+                    self._index(plants)
+                if fd is not None:
+                    os.ftruncate(fd, 0)
+                else:
+                    open(self.journal_path, 'w').close()
+                self._base_signature = self._stat_signature(self.path)
+                self._journal_signature = self._stat_signature(self.journal_path)
+                self._journal_offset = 0
+                self._journal_ops = 0
+                self._bump_generation()
+
+    def compact(self):
+        """Fold the journal into the plants.json snapshot."""
+        self._rewrite()
+
+    def all(self):
+        """Return the cached list of plants (treat it as read-only)."""
+        self.refresh()
+        with self._lock:
+            if self._plants is None:
+                self._plants = list(self._records.values())
+            return self._plants
+
+    @property
+    def version(self):
+        """Token that changes whenever the dataset changes."""
+        self.refresh()
+        return (self._base_signature, self._journal_offset)
+
+    def count(self):
+        """Return the number of plants."""
+        self.refresh()
+        return len(self._records)
+
+    def get(self, plant_id):
+        """Return the plant with the given id, or None."""
+        self.refresh()
+        return self._records.get(plant_id)
+
+    def get_many(self, plant_ids):
+        """Return the plants for the given ids in request order, skipping unknown ids."""
+        self.refresh()
+        records = self._records
+        return [records[plant_id] for plant_id in plant_ids if plant_id in records]
+
+    def add(self, plant):
+        """Insert (or replace) a single plant."""
+        self._append([{'op': 'upsert', 'plant': plant}])
+        return plant
+
+    def create(self, plant):
+        """Insert a new plant and return it, or None if its id is taken.
+
+        A plant without an id gets the first free number from count() + 1 up.
+        """
+        if not self._append([{'op': 'upsert', 'plant': plant}], create=True):
+            return None
+        return plant
+
+    def update(self, plant_id, changes):
+        """Merge changes into one plant and save; returns the new record or None."""
+        ops = [{'op': 'update', 'id': plant_id, 'changes': changes}]
+        if not self._append(ops):
+            return None
+        return ops[0]['plant']
+
+    def delete(self, plant_id):
+        """Delete one plant; returns False if it did not exist."""
+        return self.delete_many([plant_id]) == 1
+
+    def delete_many(self, plant_ids):
+        """Delete several plants; returns how many existed."""
+        with self._lock:
+            self.refresh()
+            existing = [plant_id for plant_id in dict.fromkeys(plant_ids) if plant_id in self._records]
+            if existing:
+                self._append([{'op': 'delete', 'id': plant_id} for plant_id in existing])
+            return len(existing)
+
+    def save(self, plants):
+        """Replace the whole dataset with a new snapshot."""
+        self._rewrite(plants)
+
+    def match(self, query):
+        """Plants whose name, scientific name or uses contain query."""
+        self.refresh()
+        return self.index.match(query)
+
+    def search(self, query, filters, sort, offset, limit, cursor=None):
+        """Filter, sort and page the plants; see SearchIndex.search."""
+        self.refresh()
+        return self.index.search(query, filters, sort, offset, limit, cursor)
+
+    def search_many(self, searches):
+        """Run several searches on one snapshot; see SearchIndex.search_many."""
+        self.refresh()
+        return self.index.search_many(searches)
+
+    def suggest(self, query, kinds=None, limit=10):
+        """Autocomplete suggestions as (type, value, plant id) tuples."""
+        self.refresh()
+        return self.index.suggest(query, kinds, limit)
+
+    def correct(self, query):
+        """Spelling-corrected query, or None."""
+        self.refresh()
+        return self.index.correct(query)
+
+    def compare(self, plant_ids):
+        """Comparison matrix for the given plants; see SearchIndex.compare."""
+        self.refresh()
+        return self.index.compare(plant_ids)
+
+    def similar(self, plant_id, limit=6):
+        """(plant, similarity) pairs for the plants most like plant_id."""
+        self.refresh()
+        return self.index.similar(plant_id, limit)
+
+    def facet_vocabulary(self):
+        """Filter values with plant counts; see SearchIndex.facet_vocabulary."""
+        self.refresh()
+        return self.index.facet_vocabulary()
+
+    def count_added(self, start, end=None):
+        """Count plants whose date_added falls in [start, end)."""
+        count = 0
+        for plant in self.all():
+            if 'date_added' in plant:
+                date_added = datetime.strptime(plant['date_added'], '%Y-%m-%d')
+                if date_added >= start and (end is None or date_added < end):
+                    count += 1
+        return count
+
+
+def _date_bound(moment):
+    # First 'YYYY-MM-DD' whose midnight is at or after moment, so string
+    # comparisons on date_added match the datetime comparisons above
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if day < moment:
+        day += timedelta(days=1)
+    return day.strftime('%Y-%m-%d')
+
+
+class SqlPlantStore:
+    """Plant storage backed by the Plant table (PLANT_STORAGE=sql).
+
+    Offers the same methods as PlantStore. The full record is kept as JSON
+    in Plant.data; the commonly queried fields are mirrored into their own
+    (indexed) columns so lookups and counts run as SQL queries. Plain-text
+    searches are filtered, counted, sorted and paged in SQL, facet counts
+    come from GROUP BY queries, and keyset cursors continue from the last
+    row's sort key and position. Query-language searches, relevance
+    ranking, suggestions, spelling, comparisons and similar plants use the
+    same in-memory SearchIndex as PlantStore, built from the rows when
+    first needed.
+
+    When a shared DataVersion is given, the parsed records (and that index)
+    are cached per worker until any worker bumps the 'plants' generation.
+    """
+
+    COLUMNS = ('common_name', 'scientific_name', 'medicinal_uses', 'preparation_method',
+               'parts_used', 'region', 'habitat', 'precautions', 'image_url', 'date_added')
+
+    def __init__(self, db, model, data_version=None, safety_keywords=None, aliases=None):
+        self.db = db
+        self.model = model
+        self.data_version = data_version
+        self._lock = threading.Lock()
+        self._cache = None
+        self._generation = None
+        self.safety_keywords = safety_keywords
+        self.aliases = aliases
+        self.index = SearchIndex(safety_keywords, aliases)
+        self._index_generation = None
+
+    def _cached(self):
+        """Return (plants, by_id) for the current generation."""
+        if self.data_version is None:
+            return self._load()
+        generation = self.data_version.get('plants')
+        cache = self._cache
+        if cache is None or generation != self._generation:
+            cache = self._load()
+            with self._lock:
+                self._cache = cache
+                self._generation = generation
+        return cache
+
+    def _load(self):
+        rows = self.model.query.order_by(self.model.position).all()
+        plants = [self._to_dict(row) for row in rows]
+        return plants, {plant['id']: plant for plant in plants}
+
+    def _changed(self):
+        self.db.session.commit()
+        if self.data_version is not None:
+            self.data_version.bump('plants')
+
+    def _row_values(self, plant):
+        values = {name: plant.get(name) for name in self.COLUMNS}
+        # Missing dates sort as '' (as in SearchIndex), not as NULL
+        values['date_added'] = plant.get('date_added') or ''
+        values['views'] = plant.get('views') or 0
+        values['moderated'] = bool(plant.get('moderated', False))
+        values['data'] = json.dumps(plant)
+        return values
+
+    @staticmethod
+    def _to_dict(row):
+        return json.loads(row.data)
+
+    def refresh(self):
+        """Reload the cached records if another worker changed them."""
+        self._cached()
+
+    @property
+    def version(self):
+        """Token that changes whenever the dataset changes (None: not tracked)."""
+        if self.data_version is None:
+            return None
+        return self.data_version.get('plants')
+
+    def compact(self):
+        """Nothing to compact; rows are updated in place."""
+
+    def all(self):
+        """Return all plants in dataset order (treat it as read-only)."""
+        return self._cached()[0]
+
+    def count(self):
+        """Return the number of plants."""
+        if self.data_version is None:
+            return self.model.query.count()
+        return len(self._cached()[0])
+
+    def get(self, plant_id):
+        """Return the plant with the given id, or None."""
+        if self.data_version is None:
+            row = self.db.session.get(self.model, plant_id)
+            return self._to_dict(row) if row else None
+        return self._cached()[1].get(plant_id)
+
+    def get_many(self, plant_ids):
+        """Return the plants for the given ids in request order, skipping unknown ids."""
+        if self.data_version is None:
+            rows = self.model.query.filter(self.model.id.in_(plant_ids)).all()
+            by_id = {row.id: self._to_dict(row) for row in rows}
+        else:
+            by_id = self._cached()[1]
+        return [by_id[plant_id] for plant_id in plant_ids if plant_id in by_id]
+
+    def add(self, plant):
+        """Insert (or replace) a single plant."""
+        row = self.db.session.get(self.model, plant['id'])
+        if row is None:
+            position = self.db.session.query(func.max(self.model.position)).scalar()
+            row = self.model(id=plant['id'], position=(position or 0) + 1)
+            self.db.session.add(row)
+        for name, value in self._row_values(plant).items():
+            setattr(row, name, value)
+        self._changed()
+        return plant
+
+    def create(self, plant):
+        """Insert a new plant and return it, or None if its id is taken.
+
+        A plant without an id gets the first free number from count() + 1 up.
+        The primary key settles races between workers: a generated id that
+        another worker took first is replaced by the next free one.
+        """
+        generated = plant.get('id') is None
+        while True:
+            if generated:
+                number = self.model.query.count() + 1
+                while self.db.session.get(self.model, str(number)) is not None:
+                    number += 1
+                plant['id'] = str(number)
+            elif self.db.session.get(self.model, plant['id']) is not None:
+                return None
+            position = self.db.session.query(func.max(self.model.position)).scalar()
+            row = self.model(id=plant['id'], position=(position or 0) + 1)
+            for name, value in self._row_values(plant).items():
+                setattr(row, name, value)
+            self.db.session.add(row)
+            try:
+                self._changed()
+            except IntegrityError:
+                self.db.session.rollback()
+                if not generated:
+                    return None
+                continue
+            return plant
+
+    def update(self, plant_id, changes):
+        """Merge changes into one plant and save; returns the new record or None."""
+        # Re-read the row (locked where the database supports it) so the
+        # merge starts from what other workers committed, not a stale copy
+        row = self.db.session.get(self.model, plant_id, populate_existing=True, with_for_update=True)
+        if row is None:
+            return None
+        plant = dict(self._to_dict(row), **changes)
+        for name, value in self._row_values(plant).items():
+            setattr(row, name, value)
+        self._changed()
+        return plant
+
+    def delete(self, plant_id):
+        """Delete one plant; returns False if it did not exist."""
+        return self.delete_many([plant_id]) == 1
+
+    def delete_many(self, plant_ids):
+        """Delete several plants; returns how many existed."""
+        num_deleted = self.model.query.filter(self.model.id.in_(plant_ids)).delete(synchronize_session=False)
+        self._changed()
+        return num_deleted
+
+    def save(self, plants):
+        """Replace the whole dataset."""
+        self.model.query.delete()
+        seen = set()
+        for position, plant in enumerate(plants, start=1):
+            if plant.get('id') is None or plant['id'] in seen:
+                continue
+            seen.add(plant['id'])
+            self.db.session.add(self.model(id=plant['id'], position=position, **self._row_values(plant)))
+        self._changed()
+
+    def _indexed(self):
+        """Return a SearchIndex over the current rows."""
+        if self.data_version is None:
+            index = SearchIndex(self.safety_keywords, self.aliases)
+            index.reset(self._load()[1])
+            return index
+        cache = self._cached()
+        with self._lock:
+            if self._index_generation != self._generation:
+                self.index.reset(cache[1])
+                self._index_generation = self._generation
+        return self.index
+
+    def _sql_sort(self, sort, query):
+        """(column, record key, descending) for sorts SQL can run, else None."""
+        model = self.model
+        if sort in ('name', 'name-desc'):
+            return model.common_name, 'common_name', sort == 'name-desc'
+        if sort == 'newest':
+            return model.date_added, 'date_added', True
+        if sort == 'popular':
+            return model.views, 'views', True
+        if sort == 'relevance' and query:
+            return None
+        # Dataset order
+        return model.position, None, False
+
+    @staticmethod
+    def _cursor_key(plant, field):
+        # The sort key SearchIndex would put in the cursor
+        if field is None:
+            return 0
+        if field == 'common_name':
+            return plant['common_name']
+        return plant.get(field, '' if field == 'date_added' else 0)
+
+    def _contains(self, column, value):
+        # Case-sensitive substring test, like Python's `in` (SQLite's LIKE ignores case)
+        if self.db.engine.dialect.name == 'sqlite':
+            return func.instr(column, value) > 0
+        return column.contains(value, autoescape=True)
+
+    def _filtered(self, query, filters):
+        """Plant query for the rows matching query and filters."""
+        model = self.model
+        q = model.query
+        if query:
+            needle = query.lower()
+            matches = [self._contains(func.lower(column), needle)
+                       for column in (model.common_name, model.scientific_name, model.medicinal_uses)]
+            aliased = self.index.aliases.get(' '.join(WORD.findall(needle)))
+            if aliased:
+                matches.append(model.id.in_(aliased))
+            q = q.filter(or_(*matches))
+
+        for name in ('region', 'habitat', 'preparation_method', 'parts_used'):
+            values = filters.get(name)
+            if values:
+                column = getattr(model, name)
+                q = q.filter(column != '', or_(*[self._contains(column, value) for value in values]))
+
+        medicinal_uses_filter = filters.get('medicinal_uses')
+        if medicinal_uses_filter:
+            uses = func.lower(model.medicinal_uses)
+            q = q.filter(model.medicinal_uses != '',
+                         or_(*[self._contains(uses, use.lower()) for use in medicinal_uses_filter]))
+
+        if filters.get('has_image'):
+            q = q.filter(model.image_url.isnot(None), model.image_url != '')
+
+        precautions = func.lower(func.coalesce(model.precautions, ''))
+        for flag, keywords in self.index.safety_keywords.items():
+            if filters.get(flag):
+                for keyword in keywords:
+                    q = q.filter(~self._contains(precautions, keyword))
+        return q
+
+    def _facet_counts(self, q):
+        """{facet: {value: plant count}} for the rows of q, as SearchIndex counts them."""
+        counts = {}
+        for facet in SearchIndex.FACETS:
+            column = getattr(self.model, facet)
+            facet_counts = {}
+            rows = q.with_entities(column, func.count()).filter(column != '').group_by(column).all()
+            for value, count in rows:
+                if value is None:
+                    continue
+                if facet == 'medicinal_uses':
+                    for use in {use.strip() for use in value.split(',') if use.strip()}:
+                        facet_counts[use] = facet_counts.get(use, 0) + count
+                else:
+                    facet_counts[value] = count
+            counts[facet] = facet_counts
+        return counts
+
+    def _sql_search(self, query, filters, sort, offset, limit, cursor):
+        """search() run as SQL queries, or None when the index has to answer."""
+        if query_language.is_structured(query):
+            return None
+        order = self._sql_sort(sort, query)
+        if order is None:
+            return None
+        column, field, descending = order
+        model = self.model
+        q = self._filtered(query, filters)
+        total = q.count()
+        facets = self._facet_counts(q)
+
+        if cursor is not None:
+            # Keyset pagination: keep what sorts after the cursor's row
+            sort_key, plant_id, after = _decode_cursor(cursor, sort)
+            row = self.db.session.get(model, plant_id)
+            if row is not None:
+                after = row.position
+            if field is None:
+                q = q.filter(model.position > after)
+            else:
+                beyond = column < sort_key if descending else column > sort_key
+                q = q.filter(or_(beyond, and_(column == sort_key, model.position > after)))
+            offset = 0
+
+        if offset < 0 or limit <= 0:
+            return [], total, facets, None
+        q = q.order_by(column.desc() if descending else column, model.position)
+        # One row past the page tells whether there is a next one
+        rows = q.offset(offset).limit(limit + 1).all()
+        page = [self._to_dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = _encode_cursor(sort, self._cursor_key(page[-1], field), last.id, last.position)
+        return page, total, facets, next_cursor
+
+    def match(self, query):
+        """Plants whose name, scientific name or uses contain query."""
+        return self._indexed().match(query)
+
+    def search(self, query, filters, sort, offset, limit, cursor=None):
+        """Filter, sort and page the plants; see SearchIndex.search."""
+        result = self._sql_search(query, filters, sort, offset, limit, cursor)
+        if result is None:
+            result = self._indexed().search(query, filters, sort, offset, limit, cursor)
+        return result
+
+    def search_many(self, searches):
+        """Run several searches; see SearchIndex.search_many."""
+        return [self.search(*search) for search in searches]
+
+    def suggest(self, query, kinds=None, limit=10):
+        """Autocomplete suggestions as (type, value, plant id) tuples."""
+        return self._indexed().suggest(query, kinds, limit)
+
+    def correct(self, query):
+        """Spelling-corrected query, or None."""
+        return self._indexed().correct(query)
+
+    def compare(self, plant_ids):
+        """Comparison matrix for the given plants; see SearchIndex.compare."""
+        return self._indexed().compare(plant_ids)
+
+    def similar(self, plant_id, limit=6):
+        """(plant, similarity) pairs for the plants most like plant_id."""
+        return self._indexed().similar(plant_id, limit)
+
+    def facet_vocabulary(self):
+        """Filter values with plant counts; see SearchIndex.facet_vocabulary."""
+        return self._indexed().facet_vocabulary()
+
+    def count_added(self, start, end=None):
+        """Count plants whose date_added falls in [start, end)."""
+        q = self.model.query.filter(self.model.date_added >= _date_bound(start))
+        if end is not None:
+            q = q.filter(self.model.date_added < _date_bound(end))
+        return q.count()
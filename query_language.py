@@ -0,0 +1,218 @@
+"""Query language for plant searches.
+
+    use:fever AND region:asia NOT part:root
+    "holy basil" OR tulsi
+    name:ashwa* -use:sedative
+
+Terms match whole words of the default text fields (common name,
+scientific name, medicinal uses) or of the named field; text* matches
+words starting with text and "quoted text" matches that exact text.
+Terms next to each other are ANDed; AND binds tighter than OR, NOT (or
+a leading -) negates the following term or parenthesised group.
+
+A query using none of these features (fields, quotes, wildcards,
+operators or -) is a plain search and keeps its substring meaning.
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from spelling import WORD
+
+# A single search term. field is a plant field name, or None for the
+# default text fields; kind is 'word' (a whole word), 'prefix' (words
+# starting with text, written text*) or 'phrase' (a quoted substring).
+Term = namedtuple('Term', 'field kind text')
+And = namedtuple('And', 'children')
+Or = namedtuple('Or', 'children')
+Not = namedtuple('Not', 'child')
+
+FIELD_ALIASES = {
+    'name': 'common_name',
+    'common': 'common_name',
+    'sci': 'scientific_name',
+    'scientific': 'scientific_name',
+    'use': 'medicinal_uses',
+    'uses': 'medicinal_uses',
+    'region': 'region',
+    'habitat': 'habitat',
+    'prep': 'preparation_method',
+    'preparation': 'preparation_method',
+    'part': 'parts_used',
+    'parts': 'parts_used',
+}
+FIELD_NAMES = {
+    'common_name': 'name',
+    'scientific_name': 'sci',
+    'medicinal_uses': 'use',
+    'region': 'region',
+    'habitat': 'habitat',
+    'preparation_method': 'prep',
+    'parts_used': 'part',
+}
+OPERATORS = ('AND', 'OR', 'NOT')
+
+_TOKEN = re.compile(r'''
+    (?P<lparen>\() | (?P<rparen>\)) |
+    (?P<neg>-(?=[^\s()-]))?
+    (?:(?P<field>[A-Za-z_]+):)?
+    (?:"(?P<phrase>[^"]*)"? | (?P<word>[^\s()"]+))
+''', re.VERBOSE)
+
+
+def _tokens(text):
+    tokens = []
+    depth = 0
+    for match in _TOKEN.finditer(text):
+        if match.group('lparen'):
+            depth += 1
+            tokens.append(('(',))
+        elif match.group('rparen'):
+            # Drop unbalanced closing parentheses
+            if depth:
+                depth -= 1
+                tokens.append((')',))
+        elif match.group('word') in OPERATORS and not (match.group('field') or match.group('neg')):
+            tokens.append(('op', match.group('word')))
+        else:
+            tokens.append(('term', match.group('neg') is not None, match.group('field'),
+                           match.group('phrase'), match.group('word')))
+    return tokens
+
+
+def is_structured(text):
+    """True when text uses any query language feature."""
+    for token in _tokens(text):
+        if token[0] == 'op':
+            return True
+        if token[0] == 'term':
+            negated, field, phrase, word = token[1:]
+            if (negated or phrase is not None or (word or '').endswith('*')
+                    or (field and field.lower() in FIELD_ALIASES)):
+                return True
+    return False
+
+
+def _term(negated, field, phrase, word):
+    name = FIELD_ALIASES.get(field.lower()) if field else None
+    if field and name is None:
+        # Not a field we know: the colon is part of the text
+        if word is not None:
+            word = f'{field}:{word}'
+        else:
+            phrase = f'{field}:{phrase}'
+    if phrase is not None:
+        text = ' '.join(phrase.lower().split())
+        node = Term(name, 'phrase', text) if WORD.search(text) else None
+    else:
+        prefix = word.endswith('*')
+        words = WORD.findall(word.lower())
+        if not words:
+            node = None
+        elif len(words) > 1:
+            node = Term(name, 'phrase', word.rstrip('*').lower())
+        else:
+            node = Term(name, 'prefix' if prefix else 'word', words[0])
+    if node is not None and negated:
+        node = Not(node)
+    return node
+
+
+def _combine(kind, children):
+    children = [child for child in children if child is not None]
+    if not children:
+        return None
+    if len(children) == 1:
+        return children[0]
+    return kind(tuple(children))
+
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def or_expr(self):
+        children = [self.and_expr()]
+        while self.peek() == ('op', 'OR'):
+            self.pos += 1
+            children.append(self.and_expr())
+        return _combine(Or, children)
+
+    def and_expr(self):
+        children = []
+        while True:
+            token = self.peek()
+            if token is None or token == (')',) or token == ('op', 'OR'):
+                break
+            if token == ('op', 'AND'):
+                self.pos += 1
+                continue
+            children.append(self.unary())
+        return _combine(And, children)
+
+    def unary(self):
+        if self.peek() == ('op', 'NOT'):
+            self.pos += 1
+            if self.peek() in (None, (')',), ('op', 'AND'), ('op', 'OR')):
+                # NOT with nothing to negate is dropped
+                return None
+            child = self.unary()
+            return Not(child) if child is not None else None
+        return self.primary()
+
+    def primary(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        if token == ('(',):
+            node = self.or_expr()
+            if self.peek() == (')',):
+                self.pos += 1
+            return node
+        return _term(*token[1:])
+
+
+@lru_cache(maxsize=256)
+def parse(text):
+    """Parse a query into an AST of Term/And/Or/Not nodes (None if empty)."""
+    return _Parser(_tokens(text)).or_expr()
+
+
+def to_string(node):
+    """Canonical query text for node; parses back to the same AST."""
+    if isinstance(node, Term):
+        if node.kind == 'phrase':
+            text = f'"{node.text}"'
+        else:
+            text = node.text + ('*' if node.kind == 'prefix' else '')
+        return f'{FIELD_NAMES[node.field]}:{text}' if node.field else text
+    if isinstance(node, Not):
+        child = to_string(node.child)
+        return f'NOT ({child})' if isinstance(node.child, (And, Or)) else f'NOT {child}'
+    if isinstance(node, And):
+        return ' AND '.join(f'({to_string(child)})' if isinstance(child, Or) else to_string(child)
+                            for child in node.children)
+    return ' OR '.join(to_string(child) for child in node.children)
+
+
+def normalize(text):
+    """Canonical form of a search box query, used for caching and searching."""
+    text = ' '.join(text.split())
+    if is_structured(text):
+        node = parse(text)
+        # Left as typed when nothing searchable is left (e.g. '""'):
+        # lowercasing could turn its operators into words
+        return to_string(node) if node is not None else text
+    return text.lower()
+
+
+def positive_terms(node):
+    """Text of the terms a match must contain (for relevance scoring)."""
+    if node is None or isinstance(node, Not):
+        return []
+    if isinstance(node, Term):
+        return [node.text]
+    return [text for child in node.children for text in positive_terms(child)]
@@ -0,0 +1,846 @@
+import base64
+import bisect
+import heapq
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import query_language
+from query_language import And, Not, Or, Term
+from similarity import SimilarityIndex
+from spelling import WORD, SpellingIndex
+from suggest import Suggester
+
+
+class SearchIndex:
+    """In-memory index behind the plant search endpoints.
+
+    Every plant gets an ordinal, its position in the store. The store keeps
+    the index current: reset() on a full load, upsert() and remove() for
+    single journal operations.
+    """
+
+    TEXT_FIELDS = ('common_name', 'scientific_name', 'medicinal_uses')
+    FACETS = ('region', 'habitat', 'preparation_method', 'parts_used', 'medicinal_uses')
+    NAME_FIELDS = ('common_name', 'scientific_name')
+    # Fields the query language can search word by word
+    QUERY_FIELDS = TEXT_FIELDS + ('region', 'habitat', 'preparation_method', 'parts_used')
+    # (suggestion type, field) pairs offered by suggest()
+    SUGGESTION_SOURCES = (('common_name', 'common_name'), ('scientific_name', 'scientific_name'),
+                          ('medicinal_use', 'medicinal_uses'), ('region', 'region'))
+    GRAM = 3
+    # BM25F field weights and parameters for sort='relevance'
+    RANK_FIELDS = (('common_name', 3.0), ('scientific_name', 2.0),
+                   ('medicinal_uses', 1.0), ('description', 0.5))
+    K1 = 1.2
+    B = 0.75
+    PREFIX_TERMS = 20
+    # Safety flag -> precaution keywords that clear it
+    SAFETY_KEYWORDS = {
+        'safe_pregnancy': ('pregnant', 'pregnancy', 'lactation', 'breast'),
+        'no_interactions': ('interact',),
+    }
+
+    def __init__(self, safety_keywords=None, aliases=None):
+        """aliases maps plant keys to lists of other names for the plant.
+
+        The alias table (vernacular, Sanskrit and other scientific names)
+        is compiled to a dict from normalised alias to plant keys, so a
+        search for "tulsi" also finds Holy Basil at the cost of one lookup.
+        """
+        if safety_keywords is None:
+            safety_keywords = self.SAFETY_KEYWORDS
+        self.safety_keywords = {flag: tuple(keyword.lower() for keyword in keywords)
+                                for flag, keywords in safety_keywords.items()}
+        self.aliases = {}
+        for key, names in (aliases or {}).items():
+            for name in names:
+                name = ' '.join(WORD.findall(name.lower()))
+                if name and key not in self.aliases.get(name, ()):
+                    self.aliases[name] = self.aliases.get(name, ()) + (key,)
+        self._lock = threading.RLock()
+        self.reset({})
+
+    def reset(self, records):
+        """Rebuild the index from an ordered {key: plant} mapping."""
+        with self._lock:
+            self._ordinals = {}
+            self._plants = []
+            self._texts = []
+            self._profiles = []
+            self._facet_values = []
+            self._grams = {}
+            self._terms = {}
+            self._term_list = None
+            self._query_words = {field: {} for field in self.QUERY_FIELDS}
+            self._query_word_lists = {}
+            self._field_lengths = []
+            self._length_totals = [0] * len(self.RANK_FIELDS)
+            self._values = {field: {} for field in self.FACETS}
+            self._suggestions = {kind: {} for kind, field in self.SUGGESTION_SOURCES}
+            self._words = {}
+            self._counts = {facet: {} for facet in self.FACETS}
+            self._flags = dict.fromkeys(('has_image',) + tuple(self.safety_keywords), 0)
+            self._live = 0
+            self._filter_cache = {}
+            self._suggester = None
+            self._vocabulary = None
+            self._spelling = None
+            self._removed = 0
+            self._similar = None
+            # Bitmaps are built once below: ORing one bit at a time into a
+            # growing int would copy it for every plant
+            self._building = True
+            try:
+                for key, plant in records.items():
+                    self.upsert(key, plant)
+            finally:
+                self._building = False
+            values = {field: {} for field in self.FACETS}
+            flags = {flag: [] for flag in self._flags}
+            for ordinal, plant in enumerate(self._plants):
+                for field, field_values in self._facet_values[ordinal].items():
+                    if field in values:
+                        for value in field_values:
+                            values[field].setdefault(value, []).append(ordinal)
+                for flag in self._flags_of(plant):
+                    flags[flag].append(ordinal)
+            self._values = {field: {value: self._bitmap(ordinals) for value, ordinals in field_values.items()}
+                            for field, field_values in values.items()}
+            self._flags = {flag: self._bitmap(ordinals) for flag, ordinals in flags.items()}
+            self._live = self._bitmap(range(len(self._plants)))
+            self._similar = SimilarityIndex(records)
+
+    def upsert(self, key, plant):
+        """Add a plant, or replace the one stored under key in place."""
+        with self._lock:
+            self._filter_cache = {}
+            self._vocabulary = None
+            if self._similar is not None:
+                self._similar.upsert(key, plant)
+            ordinal = self._ordinals.get(key)
+            if ordinal is None:
+                ordinal = len(self._plants)
+                self._ordinals[key] = ordinal
+                self._plants.append(None)
+                self._texts.append(())
+                self._profiles.append(None)
+                self._facet_values.append({})
+                self._field_lengths.append(())
+            else:
+                self._unindex(ordinal)
+            texts = tuple(str(plant.get(field) or '').lower() for field in self.TEXT_FIELDS)
+            self._plants[ordinal] = plant
+            self._texts[ordinal] = texts
+            self._profiles[ordinal] = self._profile(plant)
+            for gram in self._grams_of(texts):
+                self._grams.setdefault(gram, set()).add(ordinal)
+            lengths = []
+            for f, words in enumerate(self._field_words(plant)):
+                lengths.append(len(words))
+                self._length_totals[f] += len(words)
+                for word in words:
+                    counts = self._terms.setdefault(word, {}).setdefault(ordinal, [0] * len(self.RANK_FIELDS))
+                    counts[f] += 1
+            self._field_lengths[ordinal] = lengths
+            self._term_list = None
+            for field in self.QUERY_FIELDS:
+                postings = self._query_words[field]
+                for word in set(WORD.findall(str(plant.get(field) or '').lower())):
+                    postings.setdefault(word, set()).add(ordinal)
+            self._query_word_lists = {}
+            self._facet_values[ordinal] = self._field_values(plant)
+            self._count_words(ordinal, 1)
+            for field, values in self._facet_values[ordinal].items():
+                if field in self._counts:
+                    counts = self._counts[field]
+                    for value in values:
+                        counts[value] = counts.get(value, 0) + 1
+            for kind, value in self._suggestion_values(ordinal):
+                ordinals = self._suggestions[kind].setdefault(value, [])
+                bisect.insort(ordinals, ordinal)
+                if self._suggester is not None:
+                    self._suggester.add(kind, value, self._plants[ordinals[0]].get('id'))
+            if self._building:
+                return
+            bit = 1 << ordinal
+            for field, values in self._facet_values[ordinal].items():
+                if field in self._values:
+                    bitmaps = self._values[field]
+                    for value in values:
+                        bitmaps[value] = bitmaps.get(value, 0) | bit
+            for flag in self._flags_of(plant):
+                self._flags[flag] |= bit
+            self._live |= bit
+
+    def remove(self, key):
+        """Drop the plant stored under key, if any."""
+        with self._lock:
+            ordinal = self._ordinals.pop(key, None)
+            if ordinal is None:
+                return
+            self._unindex(ordinal)
+            self._plants[ordinal] = None
+            self._texts[ordinal] = ()
+            self._profiles[ordinal] = None
+            self._facet_values[ordinal] = {}
+            self._field_lengths[ordinal] = ()
+            self._filter_cache = {}
+            self._vocabulary = None
+            self._similar.remove(key)
+            self._removed += 1
+            if self._removed > 64 and self._removed > len(self._ordinals):
+                # Renumber once most ordinals are dead slots
+                live = sorted(self._ordinals.items(), key=lambda item: item[1])
+                self.reset({key: self._plants[ordinal] for key, ordinal in live})
+
+    def _unindex(self, ordinal):
+        for gram in self._grams_of(self._texts[ordinal]):
+            postings = self._grams.get(gram)
+            if postings is not None:
+                postings.discard(ordinal)
+                if not postings:
+                    del self._grams[gram]
+        for f, words in enumerate(self._field_words(self._plants[ordinal])):
+            self._length_totals[f] -= len(words)
+            for word in words:
+                postings = self._terms.get(word)
+                if postings is not None:
+                    postings.pop(ordinal, None)
+                    if not postings:
+                        del self._terms[word]
+        self._term_list = None
+        for field in self.QUERY_FIELDS:
+            postings = self._query_words[field]
+            for word in set(WORD.findall(str(self._plants[ordinal].get(field) or '').lower())):
+                ordinals = postings.get(word)
+                if ordinals is not None:
+                    ordinals.discard(ordinal)
+                    if not ordinals:
+                        del postings[word]
+        self._query_word_lists = {}
+        self._count_words(ordinal, -1)
+        for kind, value in self._suggestion_values(ordinal):
+            ordinals = self._suggestions[kind].get(value)
+            if ordinals is not None:
+                ordinals.remove(ordinal)
+                if not ordinals:
+                    del self._suggestions[kind][value]
+                if self._suggester is None:
+                    continue
+                if ordinals:
+                    self._suggester.add(kind, value, self._plants[ordinals[0]].get('id'))
+                else:
+                    self._suggester.remove(kind, value)
+        mask = ~(1 << ordinal)
+        for field, values in self._facet_values[ordinal].items():
+            if field not in self._values:
+                continue
+            bitmaps = self._values[field]
+            for value in values:
+                bitmap = bitmaps.get(value, 0) & mask
+                if bitmap:
+                    bitmaps[value] = bitmap
+                else:
+                    bitmaps.pop(value, None)
+            if field in self._counts:
+                counts = self._counts[field]
+                for value in values:
+                    if counts.get(value, 0) > 1:
+                        counts[value] -= 1
+                    else:
+                        counts.pop(value, None)
+        for flag in self._flags:
+            self._flags[flag] &= mask
+        self._live &= mask
+
+    def _count_words(self, ordinal, change):
+        # Spelling vocabulary: words of 3+ letters in names and uses, counted
+        # per value; kept current in the SpellingIndex once it is built
+        counts = {}
+        values = self._facet_values[ordinal]
+        for field in self.NAME_FIELDS + ('medicinal_uses',):
+            for value in values.get(field, ()):
+                for word in WORD.findall(value.lower()):
+                    if len(word) >= 3:
+                        counts[word] = counts.get(word, 0) + change
+        for word, count in counts.items():
+            count += self._words.get(word, 0)
+            if count > 0:
+                self._words[word] = count
+            else:
+                self._words.pop(word, None)
+        if self._spelling is not None:
+            self._spelling.update(counts)
+
+    def _flags_of(self, plant):
+        # Yes/no filters the plant passes: has_image, and each safety flag
+        # whose keywords its precautions do not mention. Worked out when
+        # the plant is indexed and kept as bitmaps like the facets
+        if plant.get('image_url'):
+            yield 'has_image'
+        precautions = str(plant.get('precautions') or '').lower()
+        for flag, keywords in self.safety_keywords.items():
+            if not any(keyword in precautions for keyword in keywords):
+                yield flag
+
+    def _suggestion_values(self, ordinal):
+        # (suggestion type, value) pairs the plant offers to suggest()
+        values = self._facet_values[ordinal]
+        return {(kind, value.capitalize() if kind == 'medicinal_use' else value)
+                for kind, field in self.SUGGESTION_SOURCES for value in values.get(field, ())}
+
+    def _field_values(self, plant):
+        # Facets hold the same values the search page offers as filter choices
+        values = {}
+        for field in self.FACETS + self.NAME_FIELDS:
+            value = plant.get(field)
+            if not isinstance(value, str) or not value:
+                continue
+            if field == 'medicinal_uses':
+                values[field] = {use.strip() for use in value.split(',') if use.strip()}
+            else:
+                values[field] = {value}
+        return values
+
+    def _profile(self, plant):
+        # (uses, regions, precaution words) in the normalised form compare() uses
+        def items(field):
+            return frozenset(filter(None, (' '.join(WORD.findall(item.lower()))
+                                           for item in str(plant.get(field) or '').split(','))))
+        precautions = ' '.join(WORD.findall(str(plant.get('precautions') or '').lower()))
+        return items('medicinal_uses'), items('region'), f' {precautions} '
+
+    def _field_words(self, plant):
+        return [WORD.findall(str(plant.get(field) or '').lower()) for field, weight in self.RANK_FIELDS]
+
+    def _expand(self, word):
+        # An exact term, or else the terms the word is a prefix of
+        if word in self._terms:
+            return [word]
+        if self._term_list is None:
+            self._term_list = sorted(self._terms)
+        terms = []
+        i = bisect.bisect_left(self._term_list, word)
+        while (i < len(self._term_list) and self._term_list[i].startswith(word)
+               and len(terms) < self.PREFIX_TERMS):
+            terms.append(self._term_list[i])
+            i += 1
+        return terms
+
+    def _scores(self, query, ordinals):
+        """BM25F score of query for each of the given ordinals.
+
+        Per-field term counts and lengths are kept with the index; name
+        fields weigh more than uses and description (RANK_FIELDS).
+        """
+        scores = dict.fromkeys(ordinals, 0.0)
+        total = len(self._ordinals)
+        if not total:
+            return scores
+        averages = [max(length / total, 1.0) for length in self._length_totals]
+        weights = [weight for field, weight in self.RANK_FIELDS]
+        if query_language.is_structured(query):
+            query = ' '.join(query_language.positive_terms(query_language.parse(query)))
+        for word in set(WORD.findall(query.lower())):
+            for term in self._expand(word):
+                postings = self._terms[term]
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                if len(postings) < len(scores):
+                    matched = [ordinal for ordinal in postings if ordinal in scores]
+                else:
+                    matched = [ordinal for ordinal in scores if ordinal in postings]
+                for ordinal in matched:
+                    lengths = self._field_lengths[ordinal]
+                    tf = 0.0
+                    for f, count in enumerate(postings[ordinal]):
+                        if count:
+                            tf += weights[f] * count / (1 - self.B + self.B * lengths[f] / averages[f])
+                    scores[ordinal] += idf * tf / (self.K1 + tf)
+        return scores
+
+    def _bitmap(self, ordinals):
+        flags = bytearray(len(self._plants) // 8 + 1)
+        for ordinal in ordinals:
+            flags[ordinal >> 3] |= 1 << (ordinal & 7)
+        return int.from_bytes(flags, 'little')
+
+    def _facet_filter(self, facet, value):
+        """Bitmap of plants whose facet field contains value (cached until the next change).
+
+        Each region, habitat, preparation method, parts-used value and each
+        comma-separated medicinal use maps to a bitmap (a Python int) of the
+        ordinals having it; a filter value ORs the bitmaps it matches.
+        """
+        key = (facet, value)
+        bitmap = self._filter_cache.get(key)
+        if bitmap is not None:
+            return bitmap
+        bitmap = 0
+        if facet == 'medicinal_uses':
+            needle = value.lower()
+            if not needle or ',' in needle or needle != needle.strip():
+                # Could match across the comma-separated uses: check the full text
+                bitmap = self._bitmap(ordinal for ordinal, plant in enumerate(self._plants)
+                                      if plant is not None and plant.get('medicinal_uses')
+                                      and needle in plant['medicinal_uses'].lower())
+            else:
+                for use, use_bitmap in self._values[facet].items():
+                    if needle in use.lower():
+                        bitmap |= use_bitmap
+        else:
+            for field_value, value_bitmap in self._values[facet].items():
+                if value in field_value:
+                    bitmap |= value_bitmap
+        self._filter_cache[key] = bitmap
+        return bitmap
+
+    def _facet_counts(self, bitmap, ordinals):
+        # Per-facet counts for a result set; the whole catalog's are kept
+        # up to date next to the facet bitmaps
+        if bitmap == self._live:
+            return {facet: dict(counts) for facet, counts in self._counts.items()}
+        # Walk the matching plants' own values: cost follows the result size
+        counts = {facet: {} for facet in self.FACETS}
+        facet_values = self._facet_values
+        for ordinal in ordinals:
+            for field, values in facet_values[ordinal].items():
+                facet_counts = counts.get(field)
+                if facet_counts is not None:
+                    for value in values:
+                        facet_counts[value] = facet_counts.get(value, 0) + 1
+        return counts
+
+    def facet_vocabulary(self):
+        """{facet: [(value, plant count), ...] sorted by value} for every facet.
+
+        The search page's filter lists; sorted on first use after a change.
+        """
+        with self._lock:
+            if self._vocabulary is None:
+                self._vocabulary = {facet: sorted(counts.items()) for facet, counts in self._counts.items()}
+            return self._vocabulary
+
+    def compare(self, keys):
+        """Side-by-side comparison of the plants under keys (unknown keys are skipped).
+
+        Returns the medicinal uses all of them share and each one's unique
+        uses, a matrix of pairwise shared-use counts, the regions shared by
+        all and by each overlapping pair, plants flagged by each safety
+        flag, and conflicts where a plant's precautions mention a use of
+        another plant. Plants are identified by id throughout. Each plant's
+        normalised use and region sets and precaution words are stored when
+        it is indexed.
+        """
+        with self._lock:
+            ordinals = []
+            for key in keys:
+                ordinal = self._ordinals.get(key)
+                if ordinal is not None and ordinal not in ordinals:
+                    ordinals.append(ordinal)
+            ids = [self._plants[ordinal].get('id') for ordinal in ordinals]
+            profiles = [self._profiles[ordinal] for ordinal in ordinals]
+            warnings = {flag: [plant_id for plant_id, ordinal in zip(ids, ordinals)
+                               if not self._flags[flag] >> ordinal & 1]
+                        for flag in self.safety_keywords}
+
+        use_counts = {}
+        for uses, regions, precautions in profiles:
+            for use in uses:
+                use_counts[use] = use_counts.get(use, 0) + 1
+        region_overlaps = []
+        conflicts = []
+        for i, (uses, regions, precautions) in enumerate(profiles):
+            for j, (other_uses, other_regions, other_precautions) in enumerate(profiles):
+                if i < j and regions & other_regions:
+                    region_overlaps.append({'plants': [ids[i], ids[j]],
+                                            'regions': sorted(regions & other_regions)})
+                if i != j:
+                    mentioned = sorted(use for use in other_uses if f' {use} ' in precautions)
+                    if mentioned:
+                        conflicts.append({'plant': ids[i], 'other': ids[j], 'uses': mentioned})
+        return {
+            'medicinal_uses': {
+                'shared': sorted(use for use, count in use_counts.items() if count == len(profiles) > 1),
+                'unique': {plant_id: sorted(use for use in profile[0] if use_counts[use] == 1)
+                           for plant_id, profile in zip(ids, profiles)},
+                'matrix': [[len(a[0] & b[0]) for b in profiles] for a in profiles],
+            },
+            'regions': {
+                'shared': sorted(frozenset.intersection(*(profile[1] for profile in profiles))) if len(profiles) > 1 else [],
+                'overlaps': region_overlaps,
+            },
+            'warnings': warnings,
+            'precaution_conflicts': conflicts,
+        }
+
+    def suggest(self, query, kinds=None, limit=10):
+        """Top suggestions for a typed prefix; returns (type, value, plant id) tuples."""
+        with self._lock:
+            # Built on first use, then updated in place by upsert()/remove();
+            # each value offers its lowest ordinal, the first plant having it
+            if self._suggester is None:
+                entries = {(kind, value): self._plants[ordinals[0]].get('id')
+                           for kind, field in self.SUGGESTION_SOURCES
+                           for value, ordinals in self._suggestions[kind].items()}
+                self._suggester = Suggester(entries)
+            return self._suggester.lookup(query, kinds, limit)
+
+    def correct(self, query):
+        """Spelling-corrected query built from known words, or None."""
+        if query_language.is_structured(query):
+            return None
+        with self._lock:
+            # Built on first use, then updated in place by upsert()/remove()
+            if self._spelling is None:
+                self._spelling = SpellingIndex(self._words)
+            return self._spelling.correct(query)
+
+    def similar(self, key, limit=6):
+        """Up to limit (plant, similarity) pairs for the plants most like the one under key.
+
+        Neighbours are ranked when first asked for and marked stale by changes.
+        """
+        with self._lock:
+            return [(self._plants[self._ordinals[other]], score)
+                    for other, score in self._similar.neighbours(key, limit)]
+
+    def _grams_of(self, texts):
+        n = self.GRAM
+        return {text[i:i + n] for text in texts for i in range(len(text) - n + 1)}
+
+    def _candidates(self, query):
+        # Ordinals that might contain query; a superset of the real matches.
+        # Text fields are broken into overlapping trigrams, each mapped to
+        # the ordinals containing it, so only plants sharing all of the
+        # query's trigrams get the substring check in _match(): the same
+        # results as scanning every plant with `in`, at a cost that follows
+        # the result size instead of the catalog
+        if len(query) < self.GRAM:
+            return range(len(self._plants))
+        postings = []
+        for gram in self._grams_of((query,)):
+            ordinals = self._grams.get(gram)
+            if not ordinals:
+                return ()
+            postings.append(ordinals)
+        postings.sort(key=len)
+        return sorted(postings[0].intersection(*postings[1:]))
+
+    def _match(self, query):
+        return [ordinal for ordinal in self._candidates(query)
+                if any(query in text for text in self._texts[ordinal])]
+
+    def _query_ordinals(self, query):
+        """Sorted ordinals matching a plain or query-language search."""
+        if query_language.is_structured(query):
+            node = query_language.parse(query)
+            if node is not None:
+                return sorted(self._evaluate(node, None))
+        ordinals = self._match(query.lower())
+        aliased = self._alias_ordinals(query)
+        if aliased:
+            ordinals = sorted(set(ordinals).union(aliased))
+        return ordinals
+
+    def _alias_ordinals(self, name):
+        # Plants known by name in the alias table
+        keys = self.aliases.get(' '.join(WORD.findall(name.lower())), ())
+        return [self._ordinals[key] for key in keys if key in self._ordinals]
+
+    def _evaluate(self, node, within):
+        """Set of ordinals matching node, limited to within unless that is None."""
+        if isinstance(node, Term):
+            return self._term_ordinals(node, within)
+        if isinstance(node, Or):
+            result = set()
+            for child in node.children:
+                result |= self._evaluate(child, within)
+            return result
+        if isinstance(node, Not):
+            base = within if within is not None else set(self._ordinals.values())
+            return base - self._evaluate(node.child, base)
+        # And: most selective clauses first, negations last, each checked
+        # only against what is left
+        positives = sorted((child for child in node.children if not isinstance(child, Not)), key=self._estimate)
+        result = within
+        for child in positives:
+            result = self._evaluate(child, result)
+            if not result:
+                return set()
+        if result is None:
+            result = set(self._ordinals.values())
+        for child in node.children:
+            if isinstance(child, Not):
+                result = result - self._evaluate(child.child, result)
+        return result
+
+    def _estimate(self, node):
+        """Upper bound on the number of plants node matches, from posting sizes."""
+        if isinstance(node, Term):
+            if node.kind == 'phrase':
+                if node.field in (None,) + self.TEXT_FIELDS and len(node.text) >= self.GRAM:
+                    return min((len(self._grams.get(gram, ())) for gram in self._grams_of((node.text,))), default=0)
+                return len(self._ordinals)
+            fields = (node.field,) if node.field else self.TEXT_FIELDS
+            return sum(len(postings) for field in fields for postings in self._word_postings(field, node))
+        if isinstance(node, Or):
+            return sum(self._estimate(child) for child in node.children)
+        if isinstance(node, And):
+            return min((self._estimate(child) for child in node.children if not isinstance(child, Not)),
+                       default=len(self._ordinals))
+        return len(self._ordinals)
+
+    def _word_postings(self, field, term):
+        # Posting sets of the words a word or prefix term stands for; the
+        # query language (see query_language) searches per-field word postings
+        words = self._query_words[field]
+        if term.kind == 'word':
+            postings = words.get(term.text)
+            return [postings] if postings else []
+        word_list = self._query_word_lists.get(field)
+        if word_list is None:
+            word_list = self._query_word_lists[field] = sorted(words)
+        found = []
+        i = bisect.bisect_left(word_list, term.text)
+        while i < len(word_list) and word_list[i].startswith(term.text):
+            found.append(words[word_list[i]])
+            i += 1
+        return found
+
+    def _term_ordinals(self, term, within):
+        fields = (term.field,) if term.field else self.TEXT_FIELDS
+        result = set()
+        if term.kind != 'prefix' and term.field in (None,) + self.NAME_FIELDS:
+            result.update(ordinal for ordinal in self._alias_ordinals(term.text)
+                          if within is None or ordinal in within)
+        for field in fields:
+            if term.kind != 'phrase':
+                for postings in self._word_postings(field, term):
+                    result |= postings if within is None else postings & within
+            elif field in self.TEXT_FIELDS:
+                # Phrases are substrings: trigram candidates, then check the field
+                i = self.TEXT_FIELDS.index(field)
+                for ordinal in self._candidates(term.text):
+                    texts = self._texts[ordinal]
+                    if texts and term.text in texts[i] and (within is None or ordinal in within):
+                        result.add(ordinal)
+            else:
+                bitmap = 0
+                for value, value_bitmap in self._values[field].items():
+                    if term.text in value.lower():
+                        bitmap |= value_bitmap
+                ordinals = set(_ordinals_of(bitmap))
+                result |= ordinals if within is None else ordinals & within
+        return result
+
+    def match(self, query):
+        """Plants matching a plain (substring) or query-language search, in store order."""
+        with self._lock:
+            return [self._plants[ordinal] for ordinal in self._query_ordinals(query)]
+
+    def search(self, query, filters, sort, offset, limit, cursor=None):
+        """Filter, sort and page the plants.
+
+        Returns (page, total, facet counts, next cursor). Only the plants
+        up to the end of the page are ordered, with a heap. A cursor from an
+        earlier page of the same sort (sort key and id of its last plant)
+        replaces offset and continues after that plant.
+        """
+        with self._lock:
+            return self._search(query, filters, sort, offset, limit, cursor, {})
+
+    def search_many(self, searches):
+        """Run (query, filters, sort, offset, limit, cursor) searches on one snapshot.
+
+        Searches with the same query or filters share the text match, the
+        filter bitmaps, the result set and its relevance scores.
+        """
+        with self._lock:
+            shared = {}
+            return [self._search(*search, shared) for search in searches]
+
+    def _select(self, query, filters, shared):
+        """Matching ordinals, facet counts and (lazily) scores for query + filters."""
+        filters_key = json.dumps(filters, sort_keys=True)
+        selection = shared.get((query, filters_key))
+        if selection is not None:
+            return selection
+
+        bitmap = shared.get(filters_key)
+        if bitmap is None:
+            bitmap = self._live
+
+            # Region, habitat, preparation, parts and uses filters: any
+            # selected value of a facet matches, every facet must match
+            for facet in self.FACETS:
+                values = filters.get(facet)
+                if values:
+                    selected = 0
+                    for value in values:
+                        selected |= self._facet_filter(facet, value)
+                    bitmap &= selected
+
+            # Image presence and safety flags
+            for flag, flag_bitmap in self._flags.items():
+                if filters.get(flag):
+                    bitmap &= flag_bitmap
+            shared[filters_key] = bitmap
+
+        if query:
+            text_bitmap = shared.get(('text', query))
+            if text_bitmap is None:
+                text_bitmap = shared[('text', query)] = self._bitmap(self._query_ordinals(query))
+            bitmap &= text_bitmap
+
+        ordinals = list(_ordinals_of(bitmap))
+        selection = {'ordinals': ordinals, 'facets': self._facet_counts(bitmap, ordinals), 'scores': None}
+        shared[(query, filters_key)] = selection
+        return selection
+
+    def _search(self, query, filters, sort, offset, limit, cursor, shared):
+        # Caller holds self._lock
+        selection = self._select(query, filters, shared)
+        ordinals = selection['ordinals']
+        facets = selection['facets']
+        key, descending = self._sort_key(sort, query, selection)
+        plants = self._plants
+        total = len(ordinals)
+
+        if cursor is not None:
+            # Keyset pagination: keep what sorts after the cursor's plant
+            sort_key, plant_id, after = _decode_cursor(cursor, sort)
+            after = self._ordinals.get(plant_id, after)
+            if descending:
+                ordinals = [o for o in ordinals if key(o) < sort_key or (key(o) == sort_key and o > after)]
+            else:
+                ordinals = [o for o in ordinals if key(o) > sort_key or (key(o) == sort_key and o > after)]
+            offset = 0
+
+        # Only the plants up to the end of the page are ordered, store
+        # order breaking ties
+        count = max(offset + limit, 0)
+        if descending:
+            top = heapq.nlargest(count, ordinals, key=lambda o: (key(o), -o))
+        else:
+            top = heapq.nsmallest(count, ordinals, key=lambda o: (key(o), o))
+        top = top[offset:]
+
+        next_cursor = None
+        if top and offset + len(top) < len(ordinals):
+            last = top[-1]
+            next_cursor = _encode_cursor(sort, key(last), plants[last].get('id'), last)
+        return [plants[ordinal] for ordinal in top], total, facets, next_cursor
+
+    def _sort_key(self, sort, query, selection):
+        """(key function on ordinals, descending) for a sort option."""
+        plants = self._plants
+        if sort == 'name':
+            return (lambda o: plants[o]['common_name']), False
+        if sort == 'name-desc':
+            return (lambda o: plants[o]['common_name']), True
+        if sort == 'newest':
+            return (lambda o: plants[o].get('date_added', '')), True
+        if sort == 'popular':
+            return (lambda o: plants[o].get('views', 0)), True
+        if sort == 'relevance' and query:
+            if selection['scores'] is None:
+                selection['scores'] = self._scores(query, selection['ordinals'])
+            return selection['scores'].__getitem__, True
+        # Store order
+        return (lambda o: 0), False
+
+
+class QueryCache:
+    """Bounded LRU cache of search responses for the current dataset version.
+
+    Entries expire after ttl seconds, and all of them are dropped as soon
+    as a lookup arrives with a different dataset version. A version of None
+    (changes not tracked) disables caching. hits and misses are counted so
+    the cache can be sized.
+    """
+
+    def __init__(self, max_entries=512, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version = None
+
+    @staticmethod
+    def key(*parts):
+        """Cache key for JSON-serializable, already normalized request parts."""
+        return json.dumps(parts, sort_keys=True, separators=(',', ':'))
+
+    def get(self, key, version):
+        """Cached value for key, or None."""
+        with self._lock:
+            if version is None or version != self._version:
+                self._entries.clear()
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, value):
+        """Remember value for key, unless the dataset changed meanwhile."""
+        with self._lock:
+            if version is None or version != self._version:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0,
+            }
+
+
+def _encode_cursor(sort, sort_key, plant_id, ordinal):
+    data = json.dumps([sort, sort_key, plant_id, ordinal], separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor, sort):
+    """Return (sort key, plant id, ordinal) from a cursor made for sort."""
+    try:
+        cursor_sort, sort_key, plant_id, ordinal = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError, AttributeError):
+        raise ValueError('Invalid cursor')
+    if cursor_sort != sort or not isinstance(ordinal, int) or not isinstance(plant_id, str):
+        raise ValueError('Cursor does not match this search')
+    # The key is compared with the plants' keys: names and dates are
+    # strings, views, relevance scores and store order numbers
+    if sort in ('name', 'name-desc', 'newest'):
+        valid = isinstance(sort_key, str)
+    else:
+        valid = isinstance(sort_key, (int, float)) and not isinstance(sort_key, bool)
+    if not valid:
+        raise ValueError('Cursor does not match this search')
+    return sort_key, plant_id, ordinal
+
+
+def _ordinals_of(bitmap):
+    """Yield the set bit positions of bitmap in increasing order."""
+    bits = bin(bitmap)[:1:-1]
+    ordinal = bits.find('1')
+    while ordinal != -1:
+        yield ordinal
+        ordinal = bits.find('1', ordinal + 1)
@@ -1,9 +1,13 @@
-import json
 import os
 import random
 import hashlib
 from datetime import datetime, timedelta
-from app import create_app, db, User, LOG_FILE
+from app import (create_app, db, User, PLANTS_FILE, DATA_VERSION_FILE, LOG_DIR, LOG_SEGMENT_BYTES,
+                 LOG_RETENTION_DAYS, ACTIVITY_COUNTERS_FILE)
+from plant_store import PlantStore
+from data_version import DataVersion
+from log_segments import LogSegments
+from activity_counters import ActivityCounters
 
 app = create_app()
 
@@ -40,13 +44,13 @@ def seed_users():
 
 def seed_plants():
     print("Seeding plants data...")
-    plants_file = 'static/data/plants.json'
-    if not os.path.exists(plants_file):
+    if not os.path.exists(PLANTS_FILE):
         print("Plants file not found!")
         return
 
-    with open(plants_file, 'r') as f:
-        plants = json.load(f)
+    # Go through PlantStore so edits still sitting in the journal are kept
+    store = PlantStore(PLANTS_FILE, data_version=DataVersion(DATA_VERSION_FILE))
+    plants = [dict(plant) for plant in store.all()]
 
     updated = False
     start_date = datetime.now() - timedelta(days=730) # 2 years ago
@@ -64,8 +68,7 @@ def seed_plants():
                 plant['views'] = random.randint(10, 500)
 
     if updated:
-        with open(plants_file, 'w') as f:
-            json.dump(plants, f, indent=2)
+        store.save(plants)
         print("Updated plants with date_added fields.")
     else:
         print("Plants already have date_added fields.")
@@ -73,9 +76,6 @@ def seed_plants():
 def seed_logs():
     print("Seeding logs...")
     logs = []
-    
-    # Ensure config directory exists
-    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
 
     # Get users
     with app.app_context():
@@ -124,8 +124,12 @@ def seed_logs():
     # Sort logs by timestamp
     logs.sort(key=lambda x: x['timestamp'])
 
-    with open(LOG_FILE, 'w') as f:
-        json.dump(logs, f, indent=2)
+    # Append to the live log so running workers see the entries on their next query
+    LogSegments(LOG_DIR, max_bytes=LOG_SEGMENT_BYTES, retention_days=LOG_RETENTION_DAYS).append(logs)
+    counters = ActivityCounters(ACTIVITY_COUNTERS_FILE)
+    for log_entry in logs:
+        counters.add(log_entry['action'], datetime.fromisoformat(log_entry['timestamp']))
+    DataVersion(DATA_VERSION_FILE).bump('logs')
     print(f"Generated {len(logs)} log entries.")
 
 if __name__ == '__main__':
@@ -0,0 +1,152 @@
+import heapq
+import math
+
+from spelling import WORD
+
+
+class SimilarityIndex:
+    """Precomputed "similar plants" lists.
+
+    Each plant is a sparse TF-IDF vector over the words of its medicinal
+    uses, parts used, preparation method and region, every word tagged
+    with its field ("root" as a part is not "root" in a use). Vectors are
+    normalised, and an inverted index from feature to the plants having it
+    turns one plant's cosine similarity with all the others into a sparse
+    product over just the plants sharing a feature with it.
+
+    Stop-words are left out, and so are features held by more than
+    COMMON_SHARE of the plants (and more than COMMON_MIN): they say little
+    about similarity and their posting lists would put most of the catalog
+    in every comparison. Ranking one plant walks its features rarest
+    first and stops taking new postings after RANK_BUDGET of them.
+
+    Neighbour lists are computed when first read and cached. A change only
+    marks the lists of the plants sharing a feature with the changed
+    plant stale; IDF weights and the common features are brought up to
+    date by a rebuild once changes since the last one pass a quarter of
+    the catalog.
+    """
+
+    FIELDS = ('medicinal_uses', 'parts_used', 'preparation_method', 'region')
+    NEIGHBOURS = 12
+    STOP_WORDS = frozenset((
+        'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'into', 'is', 'it',
+        'its', 'of', 'on', 'or', 'the', 'to', 'with',
+    ))
+    COMMON_SHARE = 0.05
+    COMMON_MIN = 50
+    RANK_BUDGET = 20000
+
+    def __init__(self, records):
+        """records maps keys to plants, as given to SearchIndex.reset()."""
+        self._features = {key: self._features_of(plant) for key, plant in records.items()}
+        self._build()
+
+    def _features_of(self, plant):
+        features = {}
+        for field in self.FIELDS:
+            for word in WORD.findall(str(plant.get(field) or '').lower()):
+                if word in self.STOP_WORDS:
+                    continue
+                feature = (field, word)
+                features[feature] = features.get(feature, 0) + 1
+        return features
+
+    def _build(self):
+        self._df = {}
+        for features in self._features.values():
+            for feature in features:
+                self._df[feature] = self._df.get(feature, 0) + 1
+        limit = max(self.COMMON_MIN, len(self._features) * self.COMMON_SHARE)
+        self._common = {feature for feature, df in self._df.items() if df > limit}
+        self._idf = {}
+        self._idf = {feature: self._weight(feature) for feature in self._df}
+        self._vectors = {}
+        self._postings = {}
+        for key, features in self._features.items():
+            self._add_vector(key, features)
+        # Ranked on first read
+        self._neighbours = {}
+        self._changes = 0
+
+    def _weight(self, feature):
+        # Smoothed IDF; features new since the last build use current counts
+        idf = self._idf.get(feature)
+        if idf is None:
+            idf = math.log((1 + len(self._features)) / (1 + self._df.get(feature, 0))) + 1
+        return idf
+
+    def _add_vector(self, key, features):
+        vector = {feature: (1 + math.log(count)) * self._weight(feature)
+                  for feature, count in features.items() if feature not in self._common}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if norm:
+            vector = {feature: weight / norm for feature, weight in vector.items()}
+        self._vectors[key] = vector
+        for feature, weight in vector.items():
+            self._postings.setdefault(feature, {})[key] = weight
+
+    def _drop(self, key):
+        features = self._features.pop(key, {})
+        for feature in features:
+            if self._df.get(feature, 0) > 1:
+                self._df[feature] -= 1
+            else:
+                self._df.pop(feature, None)
+        for feature in self._vectors.pop(key, {}):
+            postings = self._postings.get(feature)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[feature]
+        self._neighbours.pop(key, None)
+        return features
+
+    def _rank(self, key):
+        scores = {}
+        budget = self.RANK_BUDGET
+        # Rarest (highest weight) features first: they decide the closest plants
+        for feature, weight in sorted(self._vectors[key].items(), key=lambda item: -item[1]):
+            postings = self._postings[feature]
+            if len(postings) > budget:
+                break
+            budget -= len(postings)
+            for other, other_weight in postings.items():
+                if other != key:
+                    scores[other] = scores.get(other, 0.0) + weight * other_weight
+        best = heapq.nsmallest(self.NEIGHBOURS, scores.items(), key=lambda item: (-item[1], str(item[0])))
+        return [(other, round(score, 4)) for other, score in best]
+
+    def _changed(self, features):
+        """Mark the neighbour lists a change touching features may affect stale."""
+        self._changes += 1
+        if self._changes > max(16, len(self._features) // 4):
+            self._build()
+            return
+        for feature in features:
+            for other in self._postings.get(feature, ()):
+                self._neighbours.pop(other, None)
+
+    def upsert(self, key, plant):
+        """Add a plant or replace the one stored under key."""
+        old = self._drop(key)
+        features = self._features_of(plant)
+        self._features[key] = features
+        for feature in features:
+            self._df[feature] = self._df.get(feature, 0) + 1
+        self._add_vector(key, features)
+        self._changed(set(old) | set(features))
+
+    def remove(self, key):
+        """Drop the plant stored under key, if any."""
+        if key in self._features:
+            self._changed(self._drop(key))
+
+    def neighbours(self, key, limit):
+        """Up to limit (key, cosine similarity) pairs, most similar first."""
+        if key not in self._vectors:
+            return []
+        neighbours = self._neighbours.get(key)
+        if neighbours is None:
+            neighbours = self._neighbours[key] = self._rank(key)
+        return neighbours[:limit]
@@ -0,0 +1,100 @@
+import re
+
+WORD = re.compile(r'[a-z0-9]+')
+
+
+class SpellingIndex:
+    """Spelling corrections ("did you mean") using symmetric deletes (SymSpell).
+
+    Every vocabulary word is stored under each string obtained by deleting
+    up to max_distance characters from it. Looking up a misspelling only
+    generates the same deletes of the query and checks the words found
+    under them, so no edit-distance computation runs against the whole
+    vocabulary. Ties between equally close words go to the more frequent.
+    update() adds and drops words in place as the vocabulary changes.
+    """
+
+    def __init__(self, words, max_distance=2):
+        """words maps each lowercase word to how often it occurs."""
+        self.max_distance = max_distance
+        self._words = dict(words)
+        self._deletes = {}
+        for word in self._words:
+            for variant in _deletes(word, max_distance):
+                self._deletes.setdefault(variant, []).append(word)
+
+    def update(self, counts):
+        """Apply count changes (word -> change); words whose count drops to 0 are dropped."""
+        for word, change in counts.items():
+            count = self._words.get(word, 0) + change
+            if count > 0:
+                if word not in self._words:
+                    for variant in _deletes(word, self.max_distance):
+                        self._deletes.setdefault(variant, []).append(word)
+                self._words[word] = count
+            elif word in self._words:
+                del self._words[word]
+                for variant in _deletes(word, self.max_distance):
+                    words = self._deletes[variant]
+                    words.remove(word)
+                    if not words:
+                        del self._deletes[variant]
+
+    def correct_word(self, word):
+        """Closest known word, the word itself if known, or None."""
+        if word in self._words:
+            return word
+        # Allow fewer edits on short words, where two edits change too much
+        max_distance = min(self.max_distance, max(len(word) - 2, 0) // 2)
+        if max_distance == 0:
+            return None
+        best = None
+        seen = set()
+        for variant in _deletes(word, max_distance):
+            for candidate in self._deletes.get(variant, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                distance = _distance(word, candidate, max_distance)
+                if distance is None:
+                    continue
+                rank = (distance, -self._words[candidate], candidate)
+                if best is None or rank < best:
+                    best = rank
+        return best[2] if best else None
+
+    def correct(self, text):
+        """Corrected version of text, or None when there is nothing to correct."""
+        words = WORD.findall(text.lower())
+        corrected = [self.correct_word(word) or word for word in words]
+        if corrected == words:
+            return None
+        return ' '.join(corrected)
+
+
+def _deletes(word, max_distance):
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+def _distance(a, b, max_distance):
+    """Optimal string alignment distance, or None if above max_distance."""
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return None
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else None
@@ -853,42 +853,26 @@ class MedicinalPlantsApp {
   /**
    * Show related plants
    */
-  showRelatedPlants(currentPlant) {
+  async showRelatedPlants(currentPlant) {
     const container = document.getElementById('relatedPlantsContainer');
     if (!container) return;
 
-    // Find related plants based on similar region, habitat, or medicinal uses
-    const relatedPlants = this.state.plants
-      .filter(plant => plant.id !== currentPlant.id)
-      .map(plant => {
-        let score = 0;
-
-        // Region match
-        if (plant.region === currentPlant.region) score += 3;
-
-        // Habitat match
-        if (plant.habitat === currentPlant.habitat) score += 2;
-
-        // Medicinal uses overlap
-        const currentUses = (currentPlant.medicinal_uses || '').toLowerCase().split(',').map(u => u.trim());
-        const plantUses = (plant.medicinal_uses || '').toLowerCase().split(',').map(u => u.trim());
-        const commonUses = currentUses.filter(use => plantUses.includes(use));
-        score += commonUses.length;
-
-        return { plant, score };
-      })
-      .filter(item => item.score > 0)
-      .sort((a, b) => b.score - a.score)
-      .slice(0, 4)
-      .map(item => item.plant);
+    // Similar plants are precomputed on the server
+    let relatedPlants = [];
+    try {
+      const response = await fetch(`/api/plants/${encodeURIComponent(currentPlant.id)}/similar?limit=4`);
+      if (response.ok) relatedPlants = await response.json();
+    } catch (e) {
+      console.error('Failed to load related plants', e);
+    }
 
     // Render related plants
     container.innerHTML = relatedPlants.map(plant => `
       <article class="related-plant-card" onclick="medicinalPlantsApp.showPlantDetails(${JSON.stringify(plant)})">
-        <img src="${plant.image_url || this.placeholderImage}" alt="${this.sanitizeString(plant.name)}"
+        <img src="${plant.image_url || this.placeholderImage}" alt="${this.sanitizeString(plant.common_name)}"
              class="plant-image" style="aspect-ratio: 16/9; object-fit: cover;">
         <div style="padding: var(--spacing-md);">
-          <h4 style="margin: 0; font-size: var(--font-size-base);">${this.sanitizeString(plant.name)}</h4>
+          <h4 style="margin: 0; font-size: var(--font-size-base);">${this.sanitizeString(plant.common_name)}</h4>
           <p style="margin: 0; font-size: var(--font-size-sm); color: var(--color-text-light);">
             ${this.sanitizeString(plant.scientific_name || '')}
           </p>
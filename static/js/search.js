@@ -38,59 +38,36 @@ document.addEventListener('DOMContentLoaded', function () {
     // Initialize advanced features
     initializeAdvancedFeatures();
 
-    // Populate filter options from backend data
-    const populateFilterOptions = () => {
-        const filterData = window.filterData || {};
-
-        // Populate Region filters
-        if (regionFilterOptions && filterData.regions) {
-            regionFilterOptions.innerHTML = filterData.regions.map(region => `
-                <label style="display: flex; align-items: center; gap: 0.5rem; cursor: pointer;">
-                    <input type="checkbox" value="${region}" class="filter-checkbox">
-                    <span>${region}</span>
-                </label>
-            `).join('');
-        }
-
-        // Populate Habitat filters
-        if (habitatFilterOptions && filterData.habitats) {
-            habitatFilterOptions.innerHTML = filterData.habitats.map(habitat => `
-                <label style="display: flex; align-items: center; gap: 0.5rem; cursor: pointer;">
-                    <input type="checkbox" value="${habitat}" class="filter-checkbox">
-                    <span>${habitat}</span>
-                </label>
-            `).join('');
-        }
-
-        // Populate Preparation Method filters
-        if (preparationFilterOptions && filterData.preparation_methods) {
-            preparationFilterOptions.innerHTML = filterData.preparation_methods.map(method => `
-                <label style="display: flex; align-items: center; gap: 0.5rem; cursor: pointer;">
-                    <input type="checkbox" value="${method}" class="filter-checkbox">
-                    <span>${method}</span>
-                </label>
-            `).join('');
+    // Populate filter options from /api/search-facets
+    const populateFilterOptions = async () => {
+        let filterData;
+        try {
+            const response = await fetch('/api/search-facets');
+            filterData = await response.json();
+        } catch (error) {
+            console.error('Error loading filter options:', error);
+            return;
         }
 
-        // Populate Parts Used filters
-        if (partsFilterOptions && filterData.parts_used) {
-            partsFilterOptions.innerHTML = filterData.parts_used.map(part => `
+        const renderOptions = (container, items) => {
+            if (!container || !items) return;
+            container.innerHTML = items.map(item => `
                 <label style="display: flex; align-items: center; gap: 0.5rem; cursor: pointer;">
-                    <input type="checkbox" value="${part}" class="filter-checkbox">
-                    <span>${part}</span>
+                    <input type="checkbox" value="${item.value}" class="filter-checkbox">
+                    <span>${item.value}</span>
                 </label>
             `).join('');
-        }
+            // The options arrive after the listeners below are bound
+            container.querySelectorAll('input').forEach(input => {
+                input.addEventListener('change', () => performSearch(1));
+            });
+        };
 
-        // Populate Medicinal Uses filters
-        if (usesFilterOptions && filterData.medicinal_uses) {
-            usesFilterOptions.innerHTML = filterData.medicinal_uses.map(use => `
-                <label style="display: flex; align-items: center; gap: 0.5rem; cursor: pointer;">
-                    <input type="checkbox" value="${use}" class="filter-checkbox">
-                    <span>${use}</span>
-                </label>
-            `).join('');
-        }
+        renderOptions(regionFilterOptions, filterData.regions);
+        renderOptions(habitatFilterOptions, filterData.habitats);
+        renderOptions(preparationFilterOptions, filterData.preparation_methods);
+        renderOptions(partsFilterOptions, filterData.parts_used);
+        renderOptions(usesFilterOptions, filterData.medicinal_uses);
     };
 
     // Call populate function on load
@@ -361,6 +338,9 @@ document.addEventListener('DOMContentLoaded', function () {
         // Update Count
         if (resultsInfo) {
             resultsInfo.innerHTML = `Found <strong>${data.total}</strong> plants`;
+            if (data.did_you_mean) {
+                resultsInfo.innerHTML += ` for <strong>${sanitize(data.did_you_mean)}</strong>`;
+            }
         }
 
         // Update Grid
@@ -857,8 +837,9 @@ document.addEventListener('DOMContentLoaded', function () {
     }
 
     // Filter checkboxes - Updated selector to include all filter types
-    const filterInputs = document.querySelectorAll('.filter-options input, #safePregnancyFilter, #noInteractionsFilter, #hasImageFilter');
-    filterInputs.forEach(input => {
+    // (facet options loaded later bind their own listeners)
+    const filterInputsSelector = '.filter-options input, #safePregnancyFilter, #noInteractionsFilter, #hasImageFilter';
+    document.querySelectorAll(filterInputsSelector).forEach(input => {
         input.addEventListener('change', () => performSearch(1));
     });
 
@@ -866,7 +847,7 @@ document.addEventListener('DOMContentLoaded', function () {
     const clearFiltersBtn = document.getElementById('clearFilters');
     if (clearFiltersBtn) {
         clearFiltersBtn.addEventListener('click', () => {
-            filterInputs.forEach(input => input.checked = false);
+            document.querySelectorAll(filterInputsSelector).forEach(input => input.checked = false);
             performSearch(1);
         });
     }
@@ -0,0 +1,102 @@
+import bisect
+import heapq
+
+
+class Suggester:
+    """Prefix lookups for the search box suggestions.
+
+    Every suggestion value is lowercased and stored once per word start
+    ("holy basil" under "holy basil" and "basil") in one sorted key array,
+    so a typed prefix is a binary search plus a walk over the keys sharing
+    it. Each entry's rank is computed up front: common names first, then
+    matches at the start of the value, then shorter values. Recent lookups
+    are memoized, as the same prefixes arrive on every keystroke. add()
+    and remove() change single entries in place.
+    """
+
+    CACHE_SIZE = 1024
+
+    def __init__(self, entries):
+        """entries maps (type, value) to the id of a plant having it."""
+        self._entries = []
+        self._ranks = []
+        self._slots = {}
+        keyed = []
+        for (kind, value), plant_id in entries.items():
+            n = len(self._entries)
+            self._slots[(kind, value)] = n
+            self._entries.append((kind, value, plant_id))
+            self._ranks.append((kind != 'common_name', len(value), value))
+            lowered = value.lower()
+            for start in _word_starts(lowered):
+                keyed.append((lowered[start:], n, start == 0))
+        keyed.sort()
+        self._keys = [key for key, n, first in keyed]
+        self._postings = [(n, first) for key, n, first in keyed]
+        self._cache = {}
+
+    def add(self, kind, value, plant_id):
+        """Add an entry, or point an existing one at another plant."""
+        n = self._slots.get((kind, value))
+        if n is not None:
+            self._entries[n] = (kind, value, plant_id)
+        else:
+            n = self._slots[(kind, value)] = len(self._entries)
+            self._entries.append((kind, value, plant_id))
+            self._ranks.append((kind != 'common_name', len(value), value))
+            lowered = value.lower()
+            for start in _word_starts(lowered):
+                i = bisect.bisect_right(self._keys, lowered[start:])
+                self._keys.insert(i, lowered[start:])
+                self._postings.insert(i, (n, start == 0))
+        self._cache = {}
+
+    def remove(self, kind, value):
+        """Drop an entry, if present."""
+        n = self._slots.pop((kind, value), None)
+        if n is None:
+            return
+        lowered = value.lower()
+        for start in _word_starts(lowered):
+            i = bisect.bisect_left(self._keys, lowered[start:])
+            while self._postings[i][0] != n:
+                i += 1
+            del self._keys[i]
+            del self._postings[i]
+        # The slot stays empty: other postings refer to entries by number
+        self._entries[n] = None
+        self._cache = {}
+
+    def lookup(self, query, kinds=None, limit=10):
+        """Best entries with a word starting with query, optionally of the given types."""
+        query = query.lower()
+        cache_key = (query, kinds, limit)
+        result = self._cache.get(cache_key)
+        if result is not None:
+            return result
+
+        best = {}
+        i = bisect.bisect_left(self._keys, query)
+        while i < len(self._keys) and self._keys[i].startswith(query):
+            n, first = self._postings[i]
+            i += 1
+            if kinds is not None and self._entries[n][0] not in kinds:
+                continue
+            kind_rank, length, value = self._ranks[n]
+            rank = (kind_rank, not first, length, value)
+            if n not in best or rank < best[n]:
+                best[n] = rank
+        result = [self._entries[n] for n in heapq.nsmallest(limit, best, key=best.get)]
+
+        if len(self._cache) >= self.CACHE_SIZE:
+            self._cache.clear()
+        self._cache[cache_key] = result
+        return result
+
+
+def _word_starts(text):
+    starts = [0]
+    for i in range(1, len(text)):
+        if text[i].isalnum() and not text[i - 1].isalnum():
+            starts.append(i)
+    return starts